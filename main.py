@@ -1,9 +1,24 @@
 import argparse
-from src.train import train_pipeline
-from src.predict import predict_text
+import os
+import sys
+
+from src.config import HASH_SEED
+
+# pipelines are imported by the branch that runs them: training pulls in
+# sklearn model selection / metrics and pyTsetlinMachine, which a one-off
+# --predict never needs (see tools/bench_startup.py)
+
+
+def _fix_hash_seed():
+    # zemberek-python's analyses depend on the string hash seed, which can
+    # only be set before the interpreter starts: restart under HASH_SEED
+    if os.environ.get("PYTHONHASHSEED") != str(HASH_SEED):
+        os.environ["PYTHONHASHSEED"] = str(HASH_SEED)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
 
 
 def main():
+    _fix_hash_seed()
     parser = argparse.ArgumentParser(description="Turkish Fake News Detector")
 
     # dataset path for training (file OR folder)
@@ -11,18 +26,177 @@ def main():
         "--train", type=str, help="Path to dataset (CSV or folder with Fake/Real)"
     )
 
+    # process pool size for preprocessing / features / fuzzy
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for training / batch prediction (default: config.N_WORKERS) "
+        "or --serve (default: config.SERVE_WORKERS)",
+    )
+
+    # retrain from the saved feature matrices (no preprocessing)
+    parser.add_argument(
+        "--from-features",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        help="Train on a feature store written by --train (default: config.FEATURE_STORE_DIR)",
+    )
+
+    # continue training the saved model on new labeled documents
+    parser.add_argument(
+        "--update",
+        type=str,
+        help="New labeled documents (CSV or Fake/Real folder) to train the saved model on",
+    )
+
+    # hyperparameter sweep (clauses / T / s / max_features / epochs grid)
+    parser.add_argument(
+        "--sweep",
+        type=str,
+        help="YAML / JSON grid of hyperparameters to try (results: --output or models/sweep/results.csv)",
+    )
+
+    # chunked training for corpora larger than RAM
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Train from fixed-size chunks (memory bounded by --chunk-size)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Rows per chunk for --stream (default: config.STREAM_CHUNK_ROWS)",
+    )
+
+    # recompute preprocessing instead of reading the corpus cache
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the preprocessed-corpus cache (config.CORPUS_CACHE_DIR)",
+    )
+
     # text for prediction
     parser.add_argument("--predict", type=str, help="Text to classify")
 
+    # batch prediction (CSV, JSONL, Fake/Real folder or "-" for stdin)
+    parser.add_argument(
+        "--predict-file",
+        type=str,
+        help='CSV / JSONL / folder to classify ("-" reads stdin)',
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Results file for --predict-file (.csv or .jsonl, default: stdout) or --sweep (.csv)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Documents per batch for --predict-file (default: config.PREDICT_BATCH_SIZE)",
+    )
+
+    # local HTTP inference server (/predict, /predict_batch, /health, /metrics)
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve predictions over HTTP, micro-batching concurrent requests",
+    )
+    parser.add_argument(
+        "--host", type=str, default=None, help="Address for --serve (default: config.SERVE_HOST)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=None, help="Port for --serve (default: config.SERVE_PORT)"
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=None,
+        help="Texts per micro-batch for --serve (default: config.SERVE_MAX_BATCH)",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=None,
+        help="Longest wait to fill a micro-batch for --serve (default: config.SERVE_MAX_WAIT_MS)",
+    )
+
     args = parser.parse_args()
 
-    if args.train:
-        train_pipeline(args.train)
+    if args.train and args.stream:
+        from src.train import train_pipeline_stream
+
+        train_pipeline_stream(
+            args.train,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            use_cache=not args.no_cache,
+        )
+    elif args.train:
+        from src.train import train_pipeline
+
+        train_pipeline(args.train, workers=args.workers, use_cache=not args.no_cache)
+
+    if args.from_features is not None:
+        from src.train import train_from_features
+
+        train_from_features(args.from_features or None)
+
+    if args.update:
+        from src.train import update_pipeline
+
+        update_pipeline(args.update, workers=args.workers, use_cache=not args.no_cache)
+
+    if args.sweep:
+        from src.sweep import run_sweep
+
+        run_sweep(
+            args.sweep,
+            workers=args.workers,
+            output=args.output,
+            use_cache=not args.no_cache,
+        )
 
     if args.predict:
+        from src.predict import predict_text
+
         predict_text(args.predict)
 
-    if not args.train and not args.predict:
+    if args.predict_file:
+        from src.batch_predict import predict_file
+
+        predict_file(
+            args.predict_file,
+            output=args.output,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+
+    if args.serve:
+        from src.serve import run_server
+
+        run_server(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            max_batch=args.max_batch,
+            max_wait_ms=args.max_wait_ms,
+        )
+
+    if (
+        not args.train
+        and args.from_features is None
+        and not args.update
+        and not args.sweep
+        and not args.predict
+        and not args.predict_file
+        and not args.serve
+    ):
         parser.print_help()
 
 
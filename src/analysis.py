@@ -0,0 +1,58 @@
+# one pass of text analysis per document
+# (tokens, lemmas, lowercase form, surface hits)
+# shared by TF-IDF, custom features and fuzzy inputs
+
+from typing import FrozenSet, List, NamedTuple
+
+from .preprocess import tokenize, lemmatize_tokens
+from .scanner import DATE_PATTERN, scan
+
+
+class Document(NamedTuple):
+    text: str
+    lower: str
+    tokens: List[str]
+    lemmas: List[str]
+    n_upper: int
+    n_exclam: int
+    n_question: int
+    has_date: bool
+    has_repeat: bool  # (.)\1\1 anywhere in the text
+    hits: FrozenSet[str]  # scanner.KEYWORD_GROUPS found in the text
+
+    @property
+    def has_link(self) -> bool:
+        return "link" in self.hits
+
+    @property
+    def clean(self) -> str:
+        # same string preprocess() returns
+        return " ".join(self.lemmas)
+
+
+def analyze_text(text: str) -> Document:
+    lower = text.lower()
+    tokens = tokenize(text)
+    surface = scan(text, lower)
+
+    return Document(
+        text=text,
+        lower=lower,
+        tokens=tokens,
+        lemmas=lemmatize_tokens(tokens),
+        n_upper=surface.n_upper,
+        n_exclam=surface.n_exclam,
+        n_question=surface.n_question,
+        has_date=surface.has_date,
+        has_repeat=surface.has_repeat,
+        hits=surface.hits,
+    )
+
+
+def analyze_texts(texts) -> List[Document]:
+    return [analyze_text(t) for t in texts]
+
+
+def as_documents(items) -> List[Document]:
+    """accept raw strings or already analyzed documents"""
+    return [d if isinstance(d, Document) else analyze_text(d) for d in items]
@@ -0,0 +1,94 @@
+# batch prediction: CSV / JSONL / folder / stdin >> JSONL or CSV results
+# artifacts are loaded once; every batch is scored vectorized
+
+import csv
+import json
+import sys
+import time
+
+from .analysis import analyze_texts
+from .config import N_WORKERS, PREDICT_BATCH_SIZE
+from .data_loader import iter_text_batches
+from .parallel import map_chunks, worker_pool
+from .predict import get_predictor
+
+FIELDS = ["id", "tm_confidence", "fuzzy_score", "label"]
+
+
+class _JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, rec):
+        self.f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+class _CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, rec):
+        self.writer.writerow(rec)
+
+
+def predict_file(source, output=None, batch_size=None, workers=None):
+    """
+    score every document in `source` (see data_loader.iter_text_batches)
+    and stream one result per document to `output` (.csv >> CSV, anything
+    else >> JSONL; None or "-" >> stdout). returns the document count.
+    """
+
+    batch_size = batch_size or PREDICT_BATCH_SIZE
+    workers = N_WORKERS if workers is None else workers
+    predictor = get_predictor()
+
+    to_stdout = output in (None, "-")
+    out = sys.stdout if to_stdout else open(output, "w", newline="", encoding="utf-8")
+    is_csv = not to_stdout and output.lower().endswith(".csv")
+    writer = _CsvWriter(out) if is_csv else _JsonlWriter(out)
+
+    # one pool for the whole file: each worker loads the analyzer once and
+    # keeps its lemma cache from batch to batch
+    pool = worker_pool(workers)
+
+    def score(texts):
+        # texts not in the prediction cache: analysis spread over the workers
+        return predictor.predict_documents(map_chunks(analyze_texts, texts, workers, pool=pool))
+
+    n = 0
+    start = time.perf_counter()
+    hits = predictor.cache.hits
+
+    try:
+        for batch in iter_text_batches(source, batch_size):
+            results = predictor.cache.cached([r["text"] for r in batch], score)
+
+            for rec, res in zip(batch, results):
+                writer.write({"id": rec["id"], **res})
+
+            out.flush()
+            n += len(batch)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"\r{n} documents, {n / elapsed:.1f} docs/s",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if not to_stdout:
+            out.close()
+        predictor.cache.save()
+
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed > 0 else 0.0
+    print(
+        f"\rScored {n} documents in {elapsed:.2f} s ({rate:.1f} docs/s, "
+        f"{predictor.cache.hits - hits} from the prediction cache)",
+        file=sys.stderr,
+    )
+    return n
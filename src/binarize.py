@@ -0,0 +1,149 @@
+# binarization stage for the Tsetlin Machine input
+# X >> uint8 0/1 literals, computed once per matrix and cached
+#  - binarize(): sign only (X > 0)
+#  - ThermometerBinarizer: quantile thresholds fitted on training data
+
+import weakref
+
+import numpy as np
+from scipy import sparse
+
+from .config import BINARIZER_LEVELS
+
+
+# (id(X), owner) >> (weakref to X, binarized X); entries drop when X is collected
+_cache = {}
+
+
+def is_binarized(X) -> bool:
+    return X.dtype == np.uint8
+
+
+def _to_uint8(X):
+    if sparse.issparse(X):
+        return (X > 0).astype(np.uint8).tocsr()
+    return (np.asarray(X) > 0).astype(np.uint8)
+
+
+def _cached(X, owner, func):
+    key = (id(X), owner)
+    hit = _cache.get(key)
+    if hit is not None and hit[0]() is X:
+        return hit[1]
+
+    X_bin = func(X)
+
+    try:
+        ref = weakref.ref(X, lambda _, k=key: _cache.pop(k, None))
+    except TypeError:
+        return X_bin
+
+    _cache[key] = (ref, X_bin)
+    return X_bin
+
+
+def binarize(X):
+    """
+    sign binarization (X > 0) as uint8, sparse input stays sparse.
+    repeated calls with the same matrix object return the cached result
+    (do not mutate X in place after binarizing it).
+    """
+
+    if is_binarized(X):
+        return X
+
+    return _cached(X, "sign", _to_uint8)
+
+
+class ThermometerBinarizer:
+    """
+    columns < first_column (TF-IDF) >> presence bit (x > 0)
+    columns >= first_column (custom + fuzzy) >> thermometer code:
+      up to `levels` bits per column, one per distinct quantile of the
+      training data below the column maximum (bit = x > threshold). with
+      fewer than two such quantiles (0/1 flags, near-constant columns) the
+      column gets one bit, x > training minimum
+    thresholds_ rows are NaN-padded to `levels`; NaN slots make no literal
+    """
+
+    def __init__(self, levels=BINARIZER_LEVELS, first_column=0):
+        self.levels = levels
+        self.first_column = first_column
+        self.thresholds_ = None  # (n_columns - first_column, levels), NaN padded
+
+    def _tail(self, X):
+        tail = X[:, self.first_column :]
+        return tail.toarray() if sparse.issparse(tail) else np.asarray(tail)
+
+    def fit(self, X):
+        return self.fit_tail(self._tail(X))
+
+    def fit_tail(self, tail):
+        """fit on the custom/fuzzy columns only (e.g. a sample of training rows)"""
+        # results cached under the old thresholds are stale now
+        for key in [k for k in _cache if k[1] == id(self)]:
+            _cache.pop(key, None)
+
+        tail = np.asarray(tail, dtype=np.float64)
+        qs = np.linspace(0, 1, self.levels + 2)[1:-1]
+        quantiles = np.quantile(tail, qs, axis=0).T
+
+        self.thresholds_ = np.full((tail.shape[1], self.levels), np.nan)
+        for j, q in enumerate(quantiles):
+            # repeated thresholds make identical bits, thresholds >= max
+            # bits that are 0 on every training row
+            q = np.unique(q[q < tail[:, j].max()])
+            if len(q) < 2:
+                q = tail[:, j].min(keepdims=True)
+            self.thresholds_[j, : len(q)] = q
+        return self
+
+    @property
+    def _used(self):
+        # (n_columns - first_column, levels) bool: slots that make a literal
+        return ~np.isnan(self.thresholds_)
+
+    def _encode(self, X):
+        head = _to_uint8(X[:, : self.first_column])
+
+        tail = self._tail(X)
+        bits = tail[:, :, None] > self.thresholds_[None, :, :]
+        bits = bits[:, self._used].astype(np.uint8)
+
+        if sparse.issparse(head):
+            return sparse.hstack([head, bits], format="csr", dtype=np.uint8)
+        return np.hstack([head, bits])
+
+    def transform(self, X):
+        if self.thresholds_ is None:
+            raise ValueError("ThermometerBinarizer is not fitted")
+        return _cached(X, id(self), self._encode)
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+    @property
+    def n_literals(self):
+        return self.first_column + int(self._used.sum())
+
+
+def _mb(n_bytes):
+    return n_bytes / (1024 * 1024)
+
+
+def memory_report(X_bin) -> str:
+    n, m = X_bin.shape
+
+    if sparse.issparse(X_bin):
+        used = X_bin.data.nbytes + X_bin.indices.nbytes + X_bin.indptr.nbytes
+        kind = "uint8 sparse"
+    else:
+        used = X_bin.nbytes
+        kind = "uint8 dense"
+
+    return (
+        f"{n} x {m} literals: {kind} {_mb(used):.2f} MB "
+        f"(int64 dense {_mb(n * m * 8):.2f} MB, "
+        f"uint8 dense {_mb(n * m):.2f} MB, "
+        f"bit-packed {_mb(n * ((m + 7) // 8)):.2f} MB)"
+    )
@@ -0,0 +1,260 @@
+# model bundle: everything inference needs, as one versioned directory
+#   <dir>/manifest.json  >> feature store manifest; meta["bundle"] holds the
+#                           format, config, feature schema (with the fuzzy grid
+#                           resolution and fuzzy system hash), per-array sha256
+#                           and the bundle version (hash of all of them)
+#   <dir>/<name>.npy     >> raw arrays: clause weights + TA states (libTM
+#                           layout), vocabulary, idf, scaler parameters,
+#                           binarizer thresholds
+# written and read through feature_store (atomic swap, np.load mmap_mode="r"),
+# so serving processes share one page-cached copy and nothing is unpickled.
+# falls back to the loose pickles (MODEL_PATH, VECTORIZER_PATH, ...) of
+# models trained before the bundle existed.
+
+import hashlib
+import json
+import os
+import pickle
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .binarize import ThermometerBinarizer
+from .clauses import ClauseModel, export_clauses
+from .feature_spec import FEATURE_SPEC_VERSION, spec_info
+from .fuzzy import fuzzy_system_hash
+from .feature_store import MANIFEST, FeatureStore, save_feature_store
+from .transforms import FittedScaler, FittedTfidf, tfidf_supported
+from .config import *
+
+# bump when the arrays / schema below change
+BUNDLE_FORMAT = 1
+
+
+class Bundle(NamedTuple):
+    tm: object  # clauses.ClauseModel or model_tsetlin.TsetlinModel (INFERENCE_ENGINE)
+    vectorizer: object  # transforms.FittedTfidf (or a sklearn TfidfVectorizer)
+    scaler: object  # transforms.FittedScaler (or a sklearn StandardScaler)
+    binarizer: Optional[ThermometerBinarizer]  # None: legacy model, sign binarization
+    version: Optional[str]  # None: legacy pickles
+    manifest: dict
+
+
+def _json_params(estimator, skip=()):
+    params = {}
+    for key, value in estimator.get_params().items():
+        if key in skip:
+            continue
+        if key == "dtype":
+            value = np.dtype(value).name
+        elif isinstance(value, tuple):
+            value = list(value)
+        elif callable(value):
+            raise ValueError(f"Cannot bundle {type(estimator).__name__} with a custom {key}")
+        params[key] = value
+    return params
+
+
+def _sha256(array):
+    # content hash (dtype, shape, bytes) of an in-memory or memory-mapped array
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode("utf-8"))
+    h.update(memoryview(array).cast("B"))
+    return h.hexdigest()
+
+
+def _version(info):
+    # content hash: arrays + config + schema (not the creation time)
+    payload = json.dumps(info, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def save_bundle(directory, tm, vectorizer, scaler, binarizer):
+    """write the bundle for a trained model; returns its version"""
+
+    terms = vectorizer.get_feature_names_out()
+    clause_weights, ta_states = tm.state_arrays()
+    arrays = {
+        "clause_weights": clause_weights,
+        "ta_states": ta_states,
+        "vocabulary": np.asarray(terms, dtype=str),
+        "idf": vectorizer.idf_,
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "scaler_var": scaler.var_,
+        "thresholds": binarizer.thresholds_,
+    }
+
+    machine = tm.model
+    info = {
+        "format": BUNDLE_FORMAT,
+        "config": {
+            "clauses": machine.number_of_clauses,
+            "T": machine.T,
+            "s": machine.s,
+            "classes": machine.number_of_classes,
+            "literals": machine.number_of_features,
+        },
+        "schema": {
+            "feature_spec": spec_info(),
+            "tfidf": _json_params(vectorizer, skip=("vocabulary",)),
+            "scaler": {
+                **_json_params(scaler),
+                "n_samples_seen": int(np.max(scaler.n_samples_seen_)),
+            },
+            "binarizer": {"levels": binarizer.levels, "first_column": binarizer.first_column},
+            # the fuzzy column is read off this control surface
+            "fuzzy": {"grid_points": FUZZY_GRID_POINTS, "system": fuzzy_system_hash()},
+            "columns": {
+                "tfidf": len(terms),
+                "custom": len(scaler.mean_),
+                "fuzzy": binarizer.thresholds_.shape[0] - len(scaler.mean_),
+            },
+        },
+    }
+
+    info["sha256"] = {name: _sha256(a) for name, a in arrays.items()}
+    info["version"] = _version(info)
+
+    save_feature_store(directory, arrays, meta={"bundle": info})
+    return info["version"]
+
+
+def _vectorizer(params, terms, idf):
+    vectorizer = FittedTfidf(params, terms.tolist(), idf)
+    # settings FittedTfidf does not reproduce: the real thing
+    return vectorizer if tfidf_supported(params) else vectorizer.to_sklearn()
+
+
+def _scaler(params, mean, scale, var):
+    params = dict(params)
+    n_seen = params.pop("n_samples_seen")
+    return FittedScaler(params, mean, scale, var, n_seen)
+
+
+def _check_engine(engine):
+    engine = INFERENCE_ENGINE if engine is None else engine
+    if engine not in ("clauses", "tm"):
+        raise ValueError(f"Unknown inference engine {engine!r} (expected 'clauses' or 'tm')")
+    return engine
+
+
+def _check_fuzzy(info):
+    # the fuzzy score column must come from the control surface it was trained on
+    fuzzy = info["schema"].get("fuzzy")
+    if fuzzy is None:
+        print(f"Warning: bundle {info['version']} does not record its fuzzy grid / system")
+        return
+    if fuzzy["grid_points"] != FUZZY_GRID_POINTS:
+        raise ValueError(
+            f"Bundle {info['version']} was trained with FUZZY_GRID_POINTS={fuzzy['grid_points']}, "
+            f"config has {FUZZY_GRID_POINTS}: retrain the model or restore the setting"
+        )
+    system = fuzzy_system_hash()
+    if fuzzy["system"] is None or system is None:
+        print(f"Warning: fuzzy system of bundle {info['version']} not checked (fuzzy.py source unavailable)")
+    elif fuzzy["system"] != system:
+        raise ValueError(
+            f"Bundle {info['version']} was trained with another fuzzy system "
+            f"(rules / memberships in fuzzy.py changed): retrain the model"
+        )
+
+
+def load_bundle(directory=None, mmap_mode="r", backend=None, verify=True, engine=None):
+    """
+    directory: bundle written by save_bundle (None >> config.MODEL_BUNDLE_DIR)
+    mmap_mode: "r" shares the arrays read-only between processes; None loads
+               writable copies (needed to keep training, e.g. --update)
+    verify:    check every array against its manifest hash
+    engine:    "clauses" / "tm" (None >> config.INFERENCE_ENGINE); "tm" builds
+               a trainable TsetlinModel of the given backend
+    """
+
+    engine = _check_engine(engine)
+
+    store = FeatureStore(directory or MODEL_BUNDLE_DIR, mmap_mode=mmap_mode)
+    info = store.meta.get("bundle")
+    if info is None or info.get("format") != BUNDLE_FORMAT:
+        raise ValueError(
+            f"{store.directory} is not a format {BUNDLE_FORMAT} model bundle"
+        )
+
+    spec = info["schema"]["feature_spec"]["version"]
+    if spec != FEATURE_SPEC_VERSION:
+        raise ValueError(
+            f"Bundle {info['version']} was built with feature spec v{spec}, "
+            f"this code computes v{FEATURE_SPEC_VERSION}: retrain the model"
+        )
+
+    _check_fuzzy(info)
+
+    arrays = {name: store[name] for name in info["sha256"]}
+    if verify:
+        bad = [n for n, a in arrays.items() if _sha256(a) != info["sha256"][n]]
+        if bad:
+            raise ValueError(f"Bundle {store.directory} is corrupt (hash mismatch: {bad})")
+
+    schema, config = info["schema"], info["config"]
+    binarizer = ThermometerBinarizer(**schema["binarizer"])
+    binarizer.thresholds_ = arrays["thresholds"]
+
+    if 2 * binarizer.n_literals != config["literals"]:
+        raise ValueError(
+            f"Bundle {info['version']} is inconsistent: binarizer makes "
+            f"{binarizer.n_literals} literals, the machine expects {config['literals'] // 2}"
+        )
+
+    if engine == "clauses":
+        tm = ClauseModel.from_state(
+            arrays["clause_weights"], arrays["ta_states"], config["literals"], config["T"]
+        )
+    else:
+        # the training library is only imported when a trainable machine is asked for
+        from .model_tsetlin import TsetlinModel
+
+        tm = TsetlinModel(backend, clauses=config["clauses"], T=config["T"], s=config["s"])
+        tm.load_state_arrays(
+            arrays["clause_weights"], arrays["ta_states"], config["literals"] // 2
+        )
+
+    return Bundle(
+        tm=tm,
+        vectorizer=_vectorizer(schema["tfidf"], arrays["vocabulary"], arrays["idf"]),
+        scaler=_scaler(
+            schema["scaler"], arrays["scaler_mean"], arrays["scaler_scale"], arrays["scaler_var"]
+        ),
+        binarizer=binarizer,
+        version=info["version"],
+        manifest=store.manifest,
+    )
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_artifacts(mmap_mode="r", engine=None):
+    """the bundle in MODEL_BUNDLE_DIR, else the loose pickles of an older model"""
+    engine = _check_engine(engine)
+    if os.path.exists(os.path.join(MODEL_BUNDLE_DIR, MANIFEST)):
+        return load_bundle(MODEL_BUNDLE_DIR, mmap_mode=mmap_mode, engine=engine)
+
+    from .model_tsetlin import TsetlinModel
+
+    # models trained before the thermometer binarizer have no binarizer.pkl
+    # and fall back to sign binarization inside TsetlinModel
+    binarizer = None
+    if os.path.exists(BINARIZER_PATH):
+        binarizer = _load_pickle(BINARIZER_PATH)
+
+    tm = TsetlinModel()
+    tm.load(MODEL_PATH)
+    return Bundle(
+        tm=export_clauses(tm) if engine == "clauses" else tm,
+        vectorizer=_load_pickle(VECTORIZER_PATH),
+        scaler=_load_pickle(SCALER_PATH),
+        binarizer=binarizer,
+        version=None,
+        manifest={},
+    )
@@ -0,0 +1,148 @@
+# exported clauses: inference without the training machine
+#
+# a trained Tsetlin Machine only needs, per class and clause, which literals
+# the clause includes. export_clauses() / ClauseModel.from_state() turn a
+# libTM state into include bitmasks (uint64 words, literal k at bit k % 64 of
+# word k // 64), and ClauseModel evaluates them for whole batches:
+#   clause fires      >> (include & ~literals) == 0 in every word
+#   class sum         >> popcount(fired & even clauses) - popcount(fired & odd clauses)
+#   votes / confidence >> as TsetlinModel._votes / confidence (empty clauses vote 0)
+# predictions, votes and confidences are identical to TsetlinModel on the same
+# state; nothing here imports pyTsetlinMachine, and the arrays are read-only,
+# so one ClauseModel can be shared by threads.
+
+import numpy as np
+from scipy import sparse
+from scipy.special import expit
+
+from .binarize import binarize
+from .tm_numpy import _literals, _pack
+
+# rows evaluated at once ((rows, classes * clauses) intermediates stay in cache)
+_BLOCK_ROWS = 64
+
+# even clauses vote +, odd clauses vote - (bit j of a byte = clause j % 8)
+_EVEN = np.uint8(0x55)
+_ODD = np.uint8(0xAA)
+
+try:
+    _popcount = np.bitwise_count  # numpy >= 2.0
+except AttributeError:
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(a):
+        return _POPCOUNT8[a]
+
+
+class ClauseModel:
+    """
+    include:    uint64 (classes, clauses, words) literal bitmasks
+    T:          vote clamp of the trained machine (predict clamps class sums to +-T)
+    n_literals: 2 x input columns (x, then not x)
+    """
+
+    def __init__(self, include, T, n_literals):
+        self.include = include
+        self.T = T
+        self.number_of_features = n_literals
+        self.number_of_classes, self.number_of_clauses, n_words = include.shape
+
+        flat = include.reshape(-1, n_words)
+        self.nonempty = flat.any(axis=1)  # clauses without literals never fire
+        # only words some clause includes a literal from can stop a clause firing
+        self._words = np.flatnonzero(flat.any(axis=0))
+        self._include_t = np.ascontiguousarray(flat[:, self._words].T)
+        self._n_words = n_words
+
+    @classmethod
+    def from_state(cls, clause_weights, ta_states, n_literals, T):
+        """
+        libTM state (TsetlinModel.state_arrays(): weights (classes, clauses),
+        flat TA states (classes, clauses * chunks * state bits)) >> ClauseModel
+        """
+
+        clause_weights = np.asarray(clause_weights)
+        if (clause_weights != 1).any():
+            raise ValueError("Weighted clauses cannot be exported (all clause weights must be 1)")
+
+        n_classes, n_clauses = clause_weights.shape
+        chunks = (n_literals - 1) // 32 + 1
+        bits = ta_states.shape[1] // (n_clauses * chunks)
+
+        # the last state-bit plane is the include/exclude action
+        actions = np.asarray(ta_states).reshape(n_classes, n_clauses, chunks, bits)[..., -1]
+
+        n_words = (n_literals - 1) // 64 + 1
+        words = np.zeros((n_classes, n_clauses, 2 * n_words), dtype="<u4")
+        words[..., :chunks] = actions
+        include = words.view("<u8")
+
+        # libTM leaves junk in the padding bits past the last literal
+        include &= _pack(np.ones((1, n_literals), dtype=bool), n_words)[0]
+        return cls(include.astype(np.uint64), T, n_literals)
+
+    def _fired(self, X_block):
+        """dense 0/1 rows >> bool (rows, classes * clauses)"""
+        missing = ~_pack(_literals(X_block), self._n_words)[:, self._words]
+        # OR of (included & missing literal bits) over words: nonzero >> clause silent
+        violated = np.zeros((len(missing), self._include_t.shape[1]), dtype=np.uint64)
+        scratch = np.empty_like(violated)
+        for w in range(missing.shape[1]):
+            np.bitwise_and(self._include_t[w], missing[:, w, None], out=scratch)
+            violated |= scratch
+        return (violated == 0) & self.nonempty
+
+    def _blocks(self, X):
+        X_bin = binarize(X)
+        if 2 * X_bin.shape[1] != self.number_of_features:
+            raise ValueError(
+                f"Rows have {X_bin.shape[1]} literals, "
+                f"the clauses were trained on {self.number_of_features // 2}"
+            )
+        for start in range(0, X_bin.shape[0], _BLOCK_ROWS):
+            block = X_bin[start : start + _BLOCK_ROWS]
+            yield self._fired(block.toarray() if sparse.issparse(block) else np.asarray(block))
+
+    def _class_sums(self, fired):
+        fired = fired.reshape(len(fired), self.number_of_classes, self.number_of_clauses)
+        packed = np.packbits(fired, axis=2, bitorder="little")
+        positive = _popcount(packed & _EVEN).sum(axis=2, dtype=np.int64)
+        negative = _popcount(packed & _ODD).sum(axis=2, dtype=np.int64)
+        return positive - negative
+
+    def class_sums(self, X):
+        """int64 (rows, classes) clause votes per class (not clamped)"""
+        return np.concatenate([self._class_sums(f) for f in self._blocks(X)])
+
+    def predict(self, X):
+        sums = np.clip(self.class_sums(X), -self.T, self.T)
+        return sums.argmax(axis=1)
+
+    def votes(self, X):
+        """uint32 (rows, classes * clauses): 1 = clause with literals that does not fire"""
+        return np.concatenate(
+            [(~f & self.nonempty).astype(np.uint32) for f in self._blocks(X)]
+        )
+
+    def _confidence(self, fired):
+        # same as TsetlinModel.confidence: expit(mean vote), counted with popcount
+        n_fired = _popcount(np.packbits(fired, axis=1)).sum(axis=1, dtype=np.int64)
+        silent = int(self.nonempty.sum()) - n_fired
+        return expit(silent / (self.number_of_classes * self.number_of_clauses))
+
+    def confidence(self, X):
+        return np.concatenate([self._confidence(f) for f in self._blocks(X)])
+
+    def scores(self, X):
+        """(predict(X), confidence(X)) from one clause evaluation"""
+        preds, conf = [], []
+        for fired in self._blocks(X):
+            preds.append(np.clip(self._class_sums(fired), -self.T, self.T).argmax(axis=1))
+            conf.append(self._confidence(fired))
+        return np.concatenate(preds), np.concatenate(conf)
+
+
+def export_clauses(tm):
+    """trained model_tsetlin.TsetlinModel (any backend) >> ClauseModel"""
+    clause_weights, ta_states = tm.state_arrays()
+    return ClauseModel.from_state(clause_weights, ta_states, tm.model.number_of_features, tm.model.T)
@@ -2,13 +2,116 @@ DATA_PATH = "data/dummy_dataset_100k.csv"
 MODEL_PATH = "models/tsetlin_model.pkl"
 VECTORIZER_PATH = "models/tfidf.pkl"
 SCALER_PATH = "models/scaler.pkl"
+BINARIZER_PATH = "models/binarizer.pkl"
+FUZZY_GRID_PATH = "models/fuzzy_grid.npz"
+
+# versioned model bundle (manifest + raw .npy arrays, memory-mapped; see bundle.py)
+# the *_PATH pickles above are only read for models trained before it existed
+MODEL_BUNDLE_DIR = "models/bundle"
+
+# train/test feature matrices (memory-mapped .npy + manifest, see feature_store.py)
+FEATURE_STORE_DIR = "models/features"
+
+# --sweep: shared binarized feature stores (one per TF-IDF size) + results.csv
+SWEEP_DIR = "models/sweep"
+
+# per-document preprocessing cache (lemmas, custom features, fuzzy inputs)
+CORPUS_CACHE_DIR = "models/cache"
+# string hash seed main.py runs under (PYTHONHASHSEED): zemberek-python builds
+# its stem table by iterating sets, so with a random seed a word's analyses
+# ("tıbba" >> "tıp" or none) change from process to process
+HASH_SEED = 0
 
 TFIDF_MAX_FEATURES = 500
 
+# thermometer bits per custom/fuzzy column, at most (TF-IDF keeps 1 presence bit)
+BINARIZER_LEVELS = 4
+
+# fuzzy control surface resolution for batch scoring (points per input axis)
+FUZZY_GRID_POINTS = 11
+
+# surface form >> lemma LRU (shared by zemberek / zeyrek)
+LEMMA_CACHE_SIZE = 200_000
+
+# process pool for analysis / custom features / fuzzy (1 = serial)
+N_WORKERS = 1
+# documents per pool task: len(texts) / workers, at most CHUNK_SIZE
+CHUNK_SIZE = 500
+
+# threads reading Fake/Real .txt files (I/O bound)
+IO_THREADS = 16
+
+# rows per chunk for --stream training (bounds peak memory)
+STREAM_CHUNK_ROWS = 50_000
+
+# training rows kept (reservoir sample) to fit thermometer thresholds when streaming
+BINARIZER_SAMPLE_ROWS = 100_000
+
+# spill directory for --stream training (None = system temp dir)
+STREAM_TMP_DIR = None
+
+# documents per batch in --predict-file mode
+PREDICT_BATCH_SIZE = 1000
+
 TSETLIN_CLAUSES = 500
 TSETLIN_T = 15
 TSETLIN_S = 3.9
 EPOCHS = 50
 
+# rows densified per Tsetlin Machine call (bounds peak memory)
+TM_BATCH_SIZE = 10_000
+
+# per-epoch validation in TsetlinModel.fit: share of the training rows held
+# out to score every epoch (0 = train on every row, no early stopping)
+VALIDATION_SIZE = 0.1
+
+# stop after this many epochs without a better validation accuracy
+EARLY_STOP_PATIENCE = 5
+
+# best epoch so far, rewritten on every improvement (None = keep it in memory only)
+CHECKPOINT_PATH = "models/tsetlin_checkpoint.pkl"
+
+# Tsetlin Machine backend (model_tsetlin.TM_BACKENDS)
+#   "pytm"     pyTsetlinMachine (C), single thread; its RNG cannot be seeded
+#   "numpy"    bit-packed NumPy machine (tm_numpy.py), seeded by RANDOM_STATE
+TM_BACKEND = "pytm"
+
+# prediction engine for a loaded model
+#   "clauses" exported clause bitmasks evaluated in NumPy (clauses.py), no pyTsetlinMachine
+#   "tm"      the TM_BACKEND machine itself (required to keep training, e.g. --update)
+INFERENCE_ENGINE = "clauses"
+
+# --update: incremental passes over the new documents + recent training rows
+UPDATE_EPOCHS = 5
+
+# most recent feature store training rows replayed with the new documents
+# (keeps the update from forgetting what the model already knows)
+UPDATE_RECENT_ROWS = 20_000
+
+# prediction results cache (prediction_cache.py): repeated articles skip the
+# pipeline; keyed on the exact text, so a hit is always the uncached result.
+# entries kept, least recently used evicted first (0 disables the cache)
+PREDICT_CACHE_SIZE = 50_000
+# .npz the cache is loaded from / saved to (None: memory only, e.g.
+# "models/prediction_cache.npz"); a cache saved for another model bundle version is ignored
+PREDICT_CACHE_PATH = None
+
+# --serve: local HTTP inference server (serve.py)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8080
+# concurrent texts are collected into micro-batches of up to SERVE_MAX_BATCH,
+# waiting at most SERVE_MAX_WAIT_MS for more once a worker is free
+SERVE_MAX_BATCH = 64
+SERVE_MAX_WAIT_MS = 5
+# 1: one inference thread in the server process; >1: worker processes
+# (each loads the morphology analyzer, the model bundle is memory-mapped)
+SERVE_WORKERS = 1
+# longest wait for all worker processes to load and score a warm-up text
+SERVE_WARM_TIMEOUT_S = 300
+# latencies kept per endpoint for the /metrics percentiles
+SERVE_LATENCY_WINDOW = 10_000
+# largest accepted request body
+SERVE_MAX_BODY_BYTES = 16 * 1024 * 1024
+
 TEST_SIZE = 0.3
 RANDOM_STATE = 42
@@ -0,0 +1,167 @@
+# per-document preprocessing results, cached on disk
+# text >> (lemmatized text, custom features, fuzzy inputs)
+# keyed by a hash of the text plus the analysis / feature spec version, so reruns and
+# sweeps skip tokenization / lemmatization / feature extraction
+
+import hashlib
+import os
+import sqlite3
+from typing import List, NamedTuple
+
+import numpy as np
+
+from .analysis import analyze_texts
+from .feature_spec import (
+    CUSTOM_NAMES,
+    FEATURE_SPEC_VERSION,
+    FUZZY_NAMES,
+    custom_features,
+    fuzzy_inputs,
+)
+from .parallel import map_chunks
+from .preprocess import analyzer_name
+from .config import CORPUS_CACHE_DIR
+
+# bump when tokenization or lemmatization change
+# (feature formulas are versioned by feature_spec.FEATURE_SPEC_VERSION)
+# 1: zemberek-python "lemmas" were the whole WordAnalysis dump
+# 2: dictionary root of the first analysis, under config.HASH_SEED
+CORPUS_VERSION = 2
+
+N_CUSTOM = len(CUSTOM_NAMES)
+N_FUZZY_INPUTS = len(FUZZY_NAMES)
+
+
+class Corpus(NamedTuple):
+    clean: List[str]  # lemmatized text for TF-IDF
+    custom: np.ndarray  # (n, 13) unscaled feature_spec.CUSTOM_FEATURES
+    fuzzy_inputs: np.ndarray  # (n, 4) feature_spec.FUZZY_INPUTS
+
+    def __len__(self):
+        return len(self.clean)
+
+    def take(self, idx):
+        idx = np.asarray(idx)
+        return Corpus(
+            [self.clean[i] for i in idx], self.custom[idx], self.fuzzy_inputs[idx]
+        )
+
+
+def corpus_from_texts(texts) -> Corpus:
+    """analyze raw texts (module-level, so it can run in a worker process)"""
+    docs = analyze_texts(texts)
+    return Corpus([d.clean for d in docs], custom_features(docs), fuzzy_inputs(docs))
+
+
+def _merge(parts) -> Corpus:
+    if isinstance(parts, Corpus):
+        return parts
+    return Corpus(
+        [c for p in parts for c in p.clean],
+        np.vstack([p.custom for p in parts]),
+        np.vstack([p.fuzzy_inputs for p in parts]),
+    )
+
+
+def _corpus_chunks(texts):
+    # map_chunks concatenates lists; keep each chunk's Corpus whole
+    return [corpus_from_texts(texts)]
+
+
+def cache_key() -> str:
+    return f"v{CORPUS_VERSION}.{FEATURE_SPEC_VERSION}-{analyzer_name()}"
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class CorpusCache:
+    """
+    sqlite file per cache_key() under CORPUS_CACHE_DIR:
+    text hash >> clean text + float64 custom / fuzzy input rows
+    """
+
+    BATCH = 500  # sqlite host-parameter limit is 999 on older builds
+
+    def __init__(self, directory=None, key=None):
+        directory = CORPUS_CACHE_DIR if directory is None else directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"corpus-{key or cache_key()}.sqlite")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs "
+            "(key BLOB PRIMARY KEY, clean TEXT, custom BLOB, fuzzy BLOB)"
+        )
+
+    def get_many(self, keys) -> dict:
+        found = {}
+        for i in range(0, len(keys), self.BATCH):
+            part = keys[i : i + self.BATCH]
+            marks = ",".join("?" * len(part))
+            rows = self.conn.execute(
+                f"SELECT key, clean, custom, fuzzy FROM docs WHERE key IN ({marks})",
+                part,
+            )
+            for key, clean, custom, fuzzy in rows:
+                found[key] = (
+                    clean,
+                    np.frombuffer(custom, dtype=np.float64),
+                    np.frombuffer(fuzzy, dtype=np.float64),
+                )
+        return found
+
+    def put_many(self, keys, corpus: Corpus):
+        rows = (
+            (k, c, custom.astype(np.float64).tobytes(), fuzzy.astype(np.float64).tobytes())
+            for k, c, custom, fuzzy in zip(
+                keys, corpus.clean, corpus.custom, corpus.fuzzy_inputs
+            )
+        )
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.conn.close()
+
+
+def load_corpus(texts, workers=None, use_cache=True) -> Corpus:
+    """
+    Corpus for raw texts; only documents missing from the cache are analyzed
+    (in the process pool when workers > 1), then written back.
+    """
+
+    texts = list(texts)
+
+    if not use_cache:
+        return _merge(map_chunks(_corpus_chunks, texts, workers))
+
+    cache = CorpusCache()
+    try:
+        keys = [text_hash(t) for t in texts]
+        found = cache.get_many(list(set(keys)))
+
+        missing = [i for i, k in enumerate(keys) if k not in found]
+        # identical texts inside one batch are analyzed once
+        todo = list({keys[i]: i for i in missing}.values())
+
+        if todo:
+            fresh = _merge(map_chunks(_corpus_chunks, [texts[i] for i in todo], workers))
+            todo_keys = [keys[i] for i in todo]
+            cache.put_many(todo_keys, fresh)
+            for j, k in enumerate(todo_keys):
+                found[k] = (fresh.clean[j], fresh.custom[j], fresh.fuzzy_inputs[j])
+
+        print(
+            f"Corpus cache: {len(texts) - len(missing)} hits, "
+            f"{len(todo)} analyzed ({os.path.basename(cache.path)})"
+        )
+    finally:
+        cache.close()
+
+    rows = [found[k] for k in keys]
+    return Corpus(
+        [r[0] for r in rows],
+        np.array([r[1] for r in rows], dtype=np.float64).reshape(-1, N_CUSTOM),
+        np.array([r[2] for r in rows], dtype=np.float64).reshape(-1, N_FUZZY_INPUTS),
+    )
@@ -1,6 +1,59 @@
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
-from .config import DATA_PATH
+from .config import DATA_PATH, STREAM_CHUNK_ROWS, IO_THREADS
+
+
+# folder datasets: one os.scandir pass per directory, reads in a thread pool
+
+
+def _iter_txt(directory):
+    """*.txt paths of one directory, a single scandir pass (lazy)"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".txt") and entry.is_file():
+                yield entry.path
+
+
+def _read_one(path):
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return f.read().strip(), None
+    except OSError as e:
+        return None, (path, e)
+
+
+def _read_slice(paths):
+    return [_read_one(p) for p in paths]
+
+
+def _read_files(paths):
+    """read files concurrently (I/O bound) >> (texts in input order, errors)"""
+    if IO_THREADS <= 1 or len(paths) <= 1:
+        results = _read_slice(paths)
+    else:
+        # a few slices per thread instead of one future per small file
+        step = max(1, -(-len(paths) // (IO_THREADS * 4)))
+        slices = [paths[i : i + step] for i in range(0, len(paths), step)]
+        with ThreadPoolExecutor(max_workers=IO_THREADS) as ex:
+            results = [r for part in ex.map(_read_slice, slices) for r in part]
+
+    texts = [text for text, _ in results]
+    errors = [err for _, err in results if err is not None]
+    return texts, errors
+
+
+def _report_read_errors(errors, limit=10, file=None):
+    if not errors:
+        return
+    print(f"  Unreadable files: {len(errors)}", file=file)
+    for path, e in errors[:limit]:
+        print(f"    {path}: {e}", file=file)
+    if len(errors) > limit:
+        print(f"    ... and {len(errors) - limit} more", file=file)
 
 
 def load_data(dataset_path=None):
@@ -39,30 +92,24 @@ def load_data(dataset_path=None):
                 f"Folder dataset must contain Fake/ and Real/ directories inside {path}"
             )
 
-        rows = []
+        fake_files = sorted(_iter_txt(fake_dir))
+        real_files = sorted(_iter_txt(real_dir))
 
-        for file in fake_dir.glob("*.txt"):
-            try:
-                text = file.read_text(encoding="utf-8", errors="ignore").strip()
-                if text:
-                    rows.append({"text": text, "label": 0})
-            except Exception:
-                pass
+        rows = []
+        errors = []
 
-        for file in real_dir.glob("*.txt"):
-            try:
-                text = file.read_text(encoding="utf-8", errors="ignore").strip()
-                if text:
-                    rows.append({"text": text, "label": 1})
-            except Exception:
-                pass
+        for files, label in ((fake_files, 0), (real_files, 1)):
+            texts, errs = _read_files(files)
+            rows.extend({"text": t, "label": label} for t in texts if t)
+            errors.extend(errs)
 
         df = pd.DataFrame(rows)
 
         print(f"Loaded folder dataset:")
-        print(f"  Fake: {len(list(fake_dir.glob('*.txt')))} files")
-        print(f"  Real: {len(list(real_dir.glob('*.txt')))} files")
+        print(f"  Fake: {len(fake_files)} files")
+        print(f"  Real: {len(real_files)} files")
         print(f"  Usable rows: {len(df)}")
+        _report_read_errors(errors)
 
         if len(df) == 0:
             raise ValueError("No valid text files found in dataset folders")
@@ -70,3 +117,137 @@ def load_data(dataset_path=None):
         return df
 
     raise ValueError(f"Dataset path not found: {dataset_path}")
+
+
+def _iter_labeled_files(path, chunk_size):
+    for sub, label in (("Fake", 0), ("Real", 1)):
+        # paths are scanned lazily; only one chunk of texts is held at a time
+        for paths in _batched(_iter_txt(path / sub), chunk_size):
+            texts, errors = _read_files(paths)
+            _report_read_errors(errors)
+            for text in texts:
+                if text:
+                    yield {"text": text, "label": label}
+
+
+def iter_data_chunks(dataset_path=None, chunk_size=None):
+    """
+    streaming variant of load_data: yields DataFrames (text,label) of at
+    most chunk_size rows, so memory is bounded by the chunk, not the corpus.
+    same inputs as load_data (CSV via read_csv(chunksize), or Fake/Real folder).
+    """
+
+    if dataset_path is None:
+        dataset_path = DATA_PATH
+    if chunk_size is None:
+        chunk_size = STREAM_CHUNK_ROWS
+
+    path = Path(dataset_path)
+
+    if path.is_file():
+        print(f"Streaming CSV dataset: {path} ({chunk_size} rows per chunk)")
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            if "text" not in chunk.columns or "label" not in chunk.columns:
+                raise ValueError(
+                    f"CSV must contain columns: text,label. Found: {chunk.columns.tolist()}"
+                )
+            chunk = chunk[["text", "label"]].dropna()
+            if len(chunk):
+                yield chunk.reset_index(drop=True)
+        return
+
+    if path.is_dir():
+        if not (path / "Fake").exists() or not (path / "Real").exists():
+            raise ValueError(
+                f"Folder dataset must contain Fake/ and Real/ directories inside {path}"
+            )
+
+        print(f"Streaming folder dataset: {path} ({chunk_size} files per chunk)")
+        for rows in _batched(_iter_labeled_files(path, chunk_size), chunk_size):
+            yield pd.DataFrame(rows)
+        return
+
+    raise ValueError(f"Dataset path not found: {dataset_path}")
+
+
+def _batched(records, batch_size):
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_jsonl_lines(lines, source):
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            obj = json.loads(line)
+            if "text" not in obj:
+                raise ValueError(f"{source} line {i + 1}: JSON object has no 'text'")
+            yield {"id": obj.get("id", i), "text": str(obj["text"])}
+        else:
+            # plain text: one document per line
+            yield {"id": i, "text": line}
+
+
+def _iter_csv(path, batch_size):
+    for chunk in pd.read_csv(path, chunksize=batch_size):
+        if "text" not in chunk.columns:
+            raise ValueError(
+                f"CSV must contain a text column. Found: {chunk.columns.tolist()}"
+            )
+        ids = chunk["id"] if "id" in chunk.columns else chunk.index
+        for i, text in zip(ids, chunk["text"]):
+            if isinstance(text, str) and text.strip():
+                yield {"id": i.item() if hasattr(i, "item") else i, "text": text}
+
+
+def _iter_folder(path, batch_size):
+    for sub in ("Fake", "Real"):
+        if not (path / sub).is_dir():
+            continue
+        for paths in _batched(sorted(_iter_txt(path / sub)), batch_size):
+            texts, errors = _read_files(paths)
+            # results may go to stdout; errors go to stderr
+            _report_read_errors(errors, file=sys.stderr)
+            for file, text in zip(paths, texts):
+                if text:
+                    yield {"id": f"{sub}/{os.path.basename(file)}", "text": text}
+
+
+def iter_text_batches(source, batch_size):
+    """
+    stream unlabeled documents for prediction as lists of {"id", "text"}.
+    source:
+      "-"            >> stdin (JSONL objects with "text", or one text per line)
+      *.csv          >> text column (optional id column), read in chunks
+      *.jsonl/*.json >> one JSON object with "text" per line
+      folder         >> base/Fake/*.txt and base/Real/*.txt
+    """
+
+    if source == "-":
+        records = _iter_jsonl_lines(sys.stdin, "stdin")
+        yield from _batched(records, batch_size)
+        return
+
+    path = Path(source)
+
+    if path.is_dir():
+        yield from _batched(_iter_folder(path, batch_size), batch_size)
+        return
+
+    if path.is_file():
+        if path.suffix.lower() in (".jsonl", ".json"):
+            with open(path, encoding="utf-8") as f:
+                yield from _batched(_iter_jsonl_lines(f, path), batch_size)
+        else:
+            yield from _batched(_iter_csv(path, batch_size), batch_size)
+        return
+
+    raise ValueError(f"Input path not found: {source}")
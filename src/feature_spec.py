@@ -0,0 +1,130 @@
+# feature spec: the one definition of the custom feature columns and the
+# fuzzy inputs. training (corpus / build_features) and inference (Predictor)
+# both call custom_features() / fuzzy_inputs() from here.
+#
+# every column is a formula over per-document signals (surface_table), so a
+# batch is computed column-wise with NumPy instead of document by document.
+# bump FEATURE_SPEC_VERSION whenever a formula, keyword list or column order
+# changes: the corpus cache and the feature store record it.
+
+import numpy as np
+
+from .analysis import as_documents
+from .scanner import KEYWORD_GROUPS
+
+# 1: fuzzy inputs differed between training (raw sums) and prediction
+# 2: one spec; fuzzy inputs are the normalized prediction-time formulas
+FEATURE_SPEC_VERSION = 2
+
+VERB_SUFFIXES = ("iyor", "di", "mış")
+
+
+def surface_table(docs) -> dict:
+    """per-document signals as float arrays (one entry per document)"""
+    docs = as_documents(docs)
+
+    def col(values):
+        return np.fromiter(values, dtype=np.float64, count=len(docs))
+
+    return {
+        "length": col(len(d.text) for d in docs),
+        "n_upper": col(d.n_upper for d in docs),
+        "n_exclam": col(d.n_exclam for d in docs),
+        "n_question": col(d.n_question for d in docs),
+        "repeat": col(d.has_repeat for d in docs),
+        "date": col(d.has_date for d in docs),
+        "link": col(d.has_link for d in docs),
+        # keyword groups (scanner.KEYWORD_GROUPS)
+        "hedge": col("hedge" in d.hits for d in docs),
+        "source": col("source" in d.hits for d in docs),
+        "evidence": col("evidence" in d.hits for d in docs),
+        "fuzzy_hedge": col("fuzzy_hedge" in d.hits for d in docs),
+        # morphology
+        "n_tokens": col(len(d.tokens) for d in docs),
+        "n_lemmas": col(len(set(d.lemmas)) for d in docs),
+        # lemma == lowercased token: analyzer left the word as is (OOV guess)
+        "n_same": col(
+            sum(1 for t, l in zip(d.tokens, d.lemmas) if l == t.lower()) for d in docs
+        ),
+        "n_verb": col(sum(1 for t in d.tokens if t.endswith(VERB_SUFFIXES)) for d in docs),
+    }
+
+
+def _per_char(s, key):
+    return s[key] / (s["length"] + 1)
+
+
+def _per_token(s, key):
+    return s[key] / (s["n_tokens"] + 1)
+
+
+# custom feature columns, in matrix order (scaled by the StandardScaler)
+CUSTOM_FEATURES = [
+    ("cap_ratio", lambda s: _per_char(s, "n_upper")),
+    ("exclam_ratio", lambda s: _per_char(s, "n_exclam")),
+    ("question_ratio", lambda s: _per_char(s, "n_question")),
+    ("hedge_flag", lambda s: s["hedge"]),
+    ("source_flag", lambda s: s["source"]),
+    ("link_flag", lambda s: s["link"]),
+    ("date_flag", lambda s: s["date"]),
+    ("repeat_flag", lambda s: s["repeat"]),
+    ("length", lambda s: s["length"]),
+    # unique lemmas / tokens (higher >> less repetition)
+    ("lemma_ratio", lambda s: _per_token(s, "n_lemmas")),
+    ("oov_ratio", lambda s: _per_token(s, "n_same")),
+    # POS proxy: tokens ending with -iyor, -di, -mış (verb guesses)
+    ("verb_ratio", lambda s: _per_token(s, "n_verb")),
+    # spelling-noise proxy
+    ("noise_score", lambda s: s["repeat"]),
+]
+
+
+def _sensationalism(s):
+    n = np.maximum(s["length"], 1)
+    return s["n_upper"] / n * 2.5 + s["n_exclam"] / n * 5 + s["repeat"] * 0.6
+
+
+def _evidence_for_fake(s):
+    # evidence means REAL >> the fuzzy input is the lack of evidence
+    evidence = s["evidence"] * 0.5 + s["link"] * 0.3 + s["date"] * 0.2
+    return 1.0 - np.clip(evidence, 0.0, 1.0)
+
+
+# fuzzy inputs in fuzzy.INPUTS order, every value in [0, 1]
+#   sensationalism >> more fake, evidence (inverted) >> more fake,
+#   hedge >> more fake, noise >> more fake
+FUZZY_INPUTS = [
+    ("sensationalism", _sensationalism),
+    ("evidence", _evidence_for_fake),
+    ("hedge", lambda s: s["fuzzy_hedge"]),
+    ("noise", lambda s: s["repeat"]),
+]
+
+CUSTOM_NAMES = [name for name, _ in CUSTOM_FEATURES]
+FUZZY_NAMES = [name for name, _ in FUZZY_INPUTS]
+
+
+def _columns(spec, s):
+    if not len(s["length"]):
+        return np.empty((0, len(spec)))
+    return np.column_stack([f(s) for _, f in spec]).astype(np.float64)
+
+
+def custom_features(docs) -> np.ndarray:
+    """(n, 13) unscaled custom features; docs: Documents or raw strings"""
+    return _columns(CUSTOM_FEATURES, surface_table(docs))
+
+
+def fuzzy_inputs(docs) -> np.ndarray:
+    """(n, 4) fuzzy inputs in [0, 1]; docs: Documents or raw strings"""
+    return np.clip(_columns(FUZZY_INPUTS, surface_table(docs)), 0.0, 1.0)
+
+
+def spec_info() -> dict:
+    """JSON-friendly description, stored with cached corpora / feature stores"""
+    return {
+        "version": FEATURE_SPEC_VERSION,
+        "custom": CUSTOM_NAMES,
+        "fuzzy": FUZZY_NAMES,
+        "keywords": KEYWORD_GROUPS,
+    }
@@ -0,0 +1,127 @@
+# on-disk feature store: named matrices that open memory-mapped (zero-copy)
+#   <dir>/manifest.json     >> array names, kinds, shapes, dtypes + free-form meta
+#   <dir>/<name>.npy        >> dense arrays
+#   <dir>/<name>.{data,indices,indptr}.npy >> CSR components
+# .npz is a zip archive and cannot be mapped, so sparse matrices are kept as
+# their three CSR arrays; several processes opening the same store share one
+# copy through the page cache.
+
+import json
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+from scipy import sparse
+
+STORE_FORMAT = 1
+MANIFEST = "manifest.json"
+_CSR_PARTS = ("data", "indices", "indptr")
+
+
+def _save_array(directory, name, X):
+    if sparse.issparse(X):
+        X = X.tocsr()
+        files = {}
+        for part in _CSR_PARTS:
+            fname = f"{name}.{part}.npy"
+            np.save(os.path.join(directory, fname), getattr(X, part))
+            files[part] = fname
+        return {"kind": "csr", "shape": list(X.shape), "dtype": str(X.dtype), "files": files}
+
+    X = np.ascontiguousarray(X)
+    fname = f"{name}.npy"
+    np.save(os.path.join(directory, fname), X)
+    return {"kind": "dense", "shape": list(X.shape), "dtype": str(X.dtype), "files": {"array": fname}}
+
+
+def save_feature_store(directory, arrays, meta=None, objects=None):
+    """
+    arrays:  name >> ndarray or scipy.sparse matrix
+    meta:    JSON-serializable description (columns, sizes, config, ...)
+    objects: name >> picklable object stored next to the arrays
+             (e.g. the fitted vectorizer / scaler the matrices came from)
+    written to a temp dir first and swapped in, so readers never see half a store
+    """
+
+    directory = directory.rstrip("/")
+    tmp = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = {
+        "format": STORE_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arrays": {name: _save_array(tmp, name, X) for name, X in arrays.items()},
+        "objects": {},
+        "meta": meta or {},
+    }
+
+    for name, obj in (objects or {}).items():
+        fname = f"{name}.pkl"
+        with open(os.path.join(tmp, fname), "wb") as f:
+            pickle.dump(obj, f)
+        manifest["objects"][name] = fname
+
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old = None
+    if os.path.exists(directory):
+        old = f"{directory}.old-{os.getpid()}"
+        os.replace(directory, old)
+    os.replace(tmp, directory)
+    if old:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class FeatureStore:
+    """read side: store[name] >> memory-mapped ndarray or CSR matrix"""
+
+    def __init__(self, directory, mmap_mode="r"):
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+
+        path = os.path.join(directory, MANIFEST)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No feature store at {directory} ({MANIFEST} missing)")
+
+        with open(path, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get("format") != STORE_FORMAT:
+            raise ValueError(
+                f"Unsupported feature store format {self.manifest.get('format')} "
+                f"(expected {STORE_FORMAT})"
+            )
+
+    @property
+    def meta(self):
+        return self.manifest["meta"]
+
+    @property
+    def names(self):
+        return list(self.manifest["arrays"])
+
+    def _load(self, fname):
+        return np.load(os.path.join(self.directory, fname), mmap_mode=self.mmap_mode)
+
+    def __contains__(self, name):
+        return name in self.manifest["arrays"]
+
+    def __getitem__(self, name):
+        entry = self.manifest["arrays"][name]
+
+        if entry["kind"] == "dense":
+            return self._load(entry["files"]["array"])
+
+        data, indices, indptr = (self._load(entry["files"][p]) for p in _CSR_PARTS)
+        # built from the mapped buffers directly (no copy, no re-sorting)
+        X = sparse.csr_matrix(tuple(entry["shape"]), dtype=data.dtype)
+        X.data, X.indices, X.indptr = data, indices, indptr
+        return X
+
+    def load_object(self, name):
+        with open(os.path.join(self.directory, self.manifest["objects"][name]), "rb") as f:
+            return pickle.load(f)
@@ -8,30 +8,281 @@
 
 import numpy as np
 import pickle
+import time
 from pyTsetlinMachine.tm import MultiClassTsetlinMachine
+from scipy import sparse
 from scipy.special import expit
+from .binarize import binarize
+from .tm_numpy import NumpyTsetlinMachine
 from .config import *
 
 
-class TsetlinModel:
+def _dense(block):
+    # densify only a bounded block of rows right before the TM call
+    return block.toarray() if sparse.issparse(block) else block
+
+
+def _row_batches(X_bin):
+    for start in range(0, X_bin.shape[0], TM_BATCH_SIZE):
+        yield _dense(X_bin[start : start + TM_BATCH_SIZE])
+
+
+def _empty_clauses(tm):
+    """(classes * clauses,) bool: clauses that include no literal at all"""
+    chunks, bits = tm.number_of_ta_chunks, tm.number_of_state_bits
+
+    # only the first number_of_features bits of the last chunk are literals
+    valid = np.full(chunks, 0xFFFFFFFF, dtype=np.uint32)
+    tail = tm.number_of_features % 32
+    if tail:
+        valid[-1] = (1 << tail) - 1
 
-    def __init__(self):
-        self.model = MultiClassTsetlinMachine(
-            number_of_clauses=TSETLIN_CLAUSES, T=TSETLIN_T, s=TSETLIN_S
+    empty = []
+    for _, ta_states in tm.get_state():
+        # the last state-bit plane is the include/exclude action
+        actions = ta_states.reshape(tm.number_of_clauses, chunks, bits)[:, :, -1]
+        empty.append(((actions & valid) == 0).all(axis=1))
+    return np.concatenate(empty)
+
+
+# backends: name >> machine factory. every machine has the
+# MultiClassTsetlinMachine API (fit / predict / transform / get_state /
+# set_state + shape attributes), so TsetlinModel does not care which it gets
+TM_BACKENDS = {
+    # libTM (C), single thread, unseeded
+    "pytm": lambda clauses, T, s: MultiClassTsetlinMachine(
+        number_of_clauses=clauses, T=T, s=s
+    ),
+    # bit-packed NumPy machine, seeded by RANDOM_STATE
+    "numpy": lambda clauses, T, s: NumpyTsetlinMachine(clauses, T, s, seed=RANDOM_STATE),
+}
+
+
+def make_machine(backend=None, clauses=None, T=None, s=None):
+    """machine of the given backend; hyperparameters default to config"""
+    backend = TM_BACKEND if backend is None else backend
+    if backend not in TM_BACKENDS:
+        raise ValueError(
+            f"Unknown Tsetlin Machine backend {backend!r} (expected one of {sorted(TM_BACKENDS)})"
         )
+    return TM_BACKENDS[backend](
+        TSETLIN_CLAUSES if clauses is None else clauses,
+        TSETLIN_T if T is None else T,
+        TSETLIN_S if s is None else s,
+    )
+
+
+class TsetlinModel:
+
+    def __init__(self, backend=None, clauses=None, T=None, s=None):
+        self.model = make_machine(backend, clauses, T, s)
+        self._empty = None
+        self.checkpoint_path = CHECKPOINT_PATH
+        # per-epoch log of the last fit: {"epoch", "seconds", "val_accuracy"}
+        self.history = []
+
+    def _plain(self, method, X_batch):
+        # the indexed machine rebuilds its literal >> clause index (~10 ms)
+        # on every predict/transform call; inference goes through the plain
+        # multiclass path instead (not thread-safe: callers serialize)
+        if not hasattr(self.model, "indexed"):
+            return getattr(self.model, method)(X_batch)
+        indexed = self.model.indexed
+        self.model.indexed = False
+        try:
+            return getattr(self.model, method)(X_batch)
+        finally:
+            self.model.indexed = indexed
+
+    def fit(self, X, y, epochs=None):
+        """
+        epoch-by-epoch training; VALIDATION_SIZE of the rows are held out to
+        pick the best epoch and stop early (see fit_batches)
+        """
+
+        X_bin = binarize(X)
+        y = np.asarray(y)
+        n_classes = int(y.max()) + 1
+        rng = np.random.RandomState(RANDOM_STATE)
+
+        validation = None
+        n_val = int(round(len(y) * VALIDATION_SIZE))
+        if 0 < n_val < len(y):
+            order = rng.permutation(len(y))
+            val_idx, fit_idx = np.sort(order[:n_val]), np.sort(order[n_val:])
+            X_val, y_val = X_bin[val_idx], y[val_idx]
+            X_bin, y = X_bin[fit_idx], y[fit_idx]
+
+            def validation():
+                return [(X_val, y_val)]
+
+        n = X_bin.shape[0]
+
+        if n <= TM_BATCH_SIZE:
+            # small sets: the same dense block every epoch
+            X_dense = _dense(X_bin)
+
+            def batches(epoch):
+                return [(X_dense, y)]
 
-    def fit(self, X, y):
-        X_bin = (X > 0).astype(int)
-        self.model.fit(X_bin, y, epochs=EPOCHS)
+        else:
+            # larger sets: one epoch = shuffled pass over bounded row batches
+            def batches(epoch):
+                order = rng.permutation(n)
+                for start in range(0, n, TM_BATCH_SIZE):
+                    idx = np.sort(order[start : start + TM_BATCH_SIZE])
+                    yield X_bin[idx], y[idx]
+
+        self.fit_batches(batches, X_bin.shape[1], n_classes, epochs, validation)
+
+    def _init_machine(self, n_literals, n_classes):
+        # the first fit call sizes the machine from max(y) of its batch;
+        # an epochs=0 call fixes the shape before any real batch is seen.
+        # the indexed machine would also build its literal index here
+        # (~10 ms at 500 clauses); fit() rebuilds it anyway, inference never uses it
+        indexed = getattr(self.model, "indexed", None)
+        if indexed:
+            self.model.indexed = False
+        try:
+            self.model.fit(
+                np.zeros((1, n_literals), dtype=np.uint8),
+                np.array([n_classes - 1]),
+                epochs=0,
+            )
+        finally:
+            if indexed:
+                self.model.indexed = True
+
+    def _accuracy(self, blocks):
+        correct = total = 0
+        for X_batch, y_batch in blocks:
+            correct += int(np.sum(self.predict(X_batch) == np.asarray(y_batch)))
+            total += len(y_batch)
+        return correct / max(total, 1)
+
+    def fit_batches(self, epoch_batches, n_literals, n_classes, epochs=None, validation=None):
+        """
+        incremental training over a stream of batches.
+        epoch_batches(epoch) >> iterable of (X_bin block, y block); blocks
+        are densified one at a time, so only one block is ever dense.
+        validation() >> iterable of held-out (X_bin block, y block): scored
+        after every epoch; the best epoch is checkpointed to checkpoint_path,
+        training stops after EARLY_STOP_PATIENCE epochs without improvement
+        and the machine ends up in its best state.
+        """
+
+        epochs = EPOCHS if epochs is None else epochs
+        self._empty = None
+        self._init_machine(n_literals, n_classes)
+        self.history = []
+
+        best_acc, best_epoch, best_state = -1.0, 0, None
+
+        for epoch in range(1, epochs + 1):
+            start = time.perf_counter()
+            for X_batch, y_batch in epoch_batches(epoch - 1):
+                self.model.fit(
+                    _dense(X_batch), np.asarray(y_batch), epochs=1, incremental=True
+                )
+            elapsed = time.perf_counter() - start
+
+            if validation is None:
+                self.history.append({"epoch": epoch, "seconds": elapsed, "val_accuracy": None})
+                print(f"  epoch {epoch}/{epochs}: {elapsed:.2f}s")
+                continue
+
+            acc = self._accuracy(validation())
+            self.history.append({"epoch": epoch, "seconds": elapsed, "val_accuracy": acc})
+            improved = acc > best_acc
+            print(
+                f"  epoch {epoch}/{epochs}: {elapsed:.2f}s, "
+                f"validation accuracy {acc:.4f}{' (best)' if improved else ''}"
+            )
+
+            if improved:
+                best_acc, best_epoch, best_state = acc, epoch, self.model.get_state()
+                if self.checkpoint_path:
+                    self.save(self.checkpoint_path)
+            elif epoch - best_epoch >= EARLY_STOP_PATIENCE:
+                print(f"Early stop: no improvement in {EARLY_STOP_PATIENCE} epochs")
+                break
+
+        if best_state is not None and best_epoch != epoch:
+            self.model.set_state(best_state)
+            self._empty = None
+        if best_state is not None:
+            print(f"Best epoch {best_epoch} (validation accuracy {best_acc:.4f})")
+
+    def update(self, X, y, epochs=None):
+        """
+        continue training the current machine on (X, y) (no re-initialization).
+        X must be binarized into the literal space the machine was trained on.
+        """
+
+        epochs = UPDATE_EPOCHS if epochs is None else epochs
+        X_bin = binarize(X)
+        y = np.asarray(y)
+
+        if 2 * X_bin.shape[1] != self.model.number_of_features:
+            raise ValueError(
+                f"Update rows have {X_bin.shape[1]} literals, "
+                f"the model was trained on {self.model.number_of_features // 2}"
+            )
+        if len(y) and y.max() >= self.model.number_of_classes:
+            raise ValueError(
+                f"Update labels go up to {y.max()}, "
+                f"the model has {self.model.number_of_classes} classes"
+            )
+
+        self._empty = None
+        rng = np.random.RandomState(RANDOM_STATE)
+        for epoch in range(epochs):
+            # rows stay shuffled inside each block: replayed and new rows interleave
+            order = rng.permutation(len(y))
+            for start in range(0, len(y), TM_BATCH_SIZE):
+                idx = order[start : start + TM_BATCH_SIZE]
+                self.model.fit(_dense(X_bin[idx]), y[idx], epochs=1, incremental=True)
 
     def predict(self, X):
-        X_bin = (X > 0).astype(int)
-        return self.model.predict(X_bin)
+        X_bin = binarize(X)
+        return np.concatenate(
+            [self._plain("predict", b) for b in _row_batches(X_bin)]
+        )
+
+    def _votes(self, X_batch):
+        votes = self._plain("transform", X_batch)
+        # the indexed transform treats clauses without literals as firing
+        # (inverted vote 0); the plain path reports them as not firing
+        if self._empty is None:
+            self._empty = _empty_clauses(self.model)
+        votes[:, self._empty] = 0
+        return votes
 
     def confidence(self, X):
-        X_bin = (X > 0).astype(int)
-        votes = self.model.transform(X_bin)
-        return expit(votes.mean(axis=1))
+        X_bin = binarize(X)
+        # mean clause votes per batch (never hold all n x clauses votes)
+        mean_votes = np.concatenate(
+            [self._votes(b).mean(axis=1) for b in _row_batches(X_bin)]
+        )
+        return expit(mean_votes)
+
+    def scores(self, X):
+        """(predict(X), confidence(X))"""
+        return self.predict(X), self.confidence(X)
+
+    def state_arrays(self):
+        """
+        machine state as two arrays in libTM's layout (any backend):
+        clause weights (classes, clauses), TA states (classes, clauses * chunks * state bits)
+        """
+        state = self.model.get_state()
+        return np.stack([w for w, _ in state]), np.stack([ta for _, ta in state])
+
+    def load_state_arrays(self, weights, ta_states, n_literals):
+        """shape the machine for n_literals inputs and adopt state_arrays() output"""
+        self._empty = None
+        self._init_machine(n_literals, len(ta_states))
+        self.model.set_state(list(zip(weights, ta_states)))
 
     def save(self, path):
         with open(path, "wb") as f:
@@ -40,3 +291,4 @@ class TsetlinModel:
     def load(self, path):
         with open(path, "rb") as f:
             self.model = pickle.load(f)
+        self._empty = None
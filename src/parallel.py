@@ -0,0 +1,65 @@
+# process-pool helpers for the per-document stages
+# (analysis, custom features, fuzzy scoring)
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import N_WORKERS, CHUNK_SIZE
+from .preprocess import get_analyzer
+
+
+def _init_worker():
+    # every worker process loads its own morphology analyzer once
+    get_analyzer()
+
+
+def _chunks(items, size):
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def worker_pool(workers=None):
+    """
+    process pool (analyzer loaded once per worker) to reuse across
+    map_chunks calls; None when workers <= 1. the caller shuts it down
+    """
+
+    workers = N_WORKERS if workers is None else workers
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def map_chunks(batch_func, items, workers=None, chunk_size=None, pool=None):
+    """
+    apply batch_func (list >> list or ndarray) over chunks of items.
+    chunks run in a process pool when workers > 1 (`pool`: one from
+    worker_pool() with `workers` processes, else a pool for this call);
+    results come back in input order and are concatenated, so output matches
+    batch_func(items). batch_func must be a module-level function (picklable).
+    chunks: len(items) / workers, at most CHUNK_SIZE
+    """
+
+    workers = N_WORKERS if workers is None else workers
+    items = list(items)
+
+    if workers <= 1 or len(items) < 2:
+        return batch_func(items)
+
+    if chunk_size is None:
+        chunk_size = min(CHUNK_SIZE, math.ceil(len(items) / workers))
+
+    if pool is None:
+        with worker_pool(workers) as pool:
+            parts = list(pool.map(batch_func, _chunks(items, chunk_size)))
+    else:
+        parts = list(pool.map(batch_func, _chunks(items, chunk_size)))
+
+    if isinstance(parts[0], np.ndarray):
+        return np.vstack(parts)
+
+    out = []
+    for p in parts:
+        out.extend(p)
+    return out
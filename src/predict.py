@@ -1,81 +1,122 @@
-import re
-import pickle
+import contextlib
+import threading
 import numpy as np
-
-from .preprocess import preprocess
-from .model_tsetlin import TsetlinModel
-from .features import extract_custom_features
-from .fuzzy import compute_fuzzy_score
+from scipy import sparse
+
+from .analysis import analyze_text
+from .bundle import load_artifacts
+from .clauses import ClauseModel
+from .feature_spec import FUZZY_NAMES, custom_features, fuzzy_inputs
+from .fuzzy import compute_fuzzy_scores, get_fuzzy_grid
+from .prediction_cache import PredictionCache
 from .config import *
 
 
-def _clamp01(x):
-    return max(0.0, min(1.0, float(x)))
+def _extract_fuzzy_inputs(doc):
+    """
+    normalized fuzzy inputs in range [0,1] (feature_spec.FUZZY_INPUTS).
+    doc: analysis.Document (a raw string is analyzed first)
+    """
+
+    return dict(zip(FUZZY_NAMES, fuzzy_inputs([doc])[0].tolist()))
 
 
-def _extract_fuzzy_inputs(text: str):
+class Predictor:
     """
-    produce normalized fuzzy inputs in range [0,1].
-      - sensationalism >> more fake
-      - evidence  >> more real  (so we invert later)
-      - hedge  >> more fake
-      - noise  >> more fake
+    warm predictor: loads the model bundle (TF-IDF / scaler / binarizer /
+    Tsetlin state) once and reuses it for every call. safe to share between threads.
     """
 
-    lower = text.lower()
-    length = max(len(text), 1)
-
-    # sensationalism
-    upper_ratio = sum(1 for c in text if c.isupper()) / length
-    exclam_ratio = text.count("!") / length
-    repeat_flag = 1.0 if re.search(r"(.)\1\1", text) else 0.0
-
-    sensationalism = _clamp01(upper_ratio * 2.5 + exclam_ratio * 5 + repeat_flag * 0.6)
-
-    # evidence -- REAL indicator
-    evidence_keywords = [
-        "kaynak",
-        "haber ajansı",
-        "resmi açıklama",
-        "bakanlık",
-        "verilere göre",
-        "rapora göre",
-        "araştırmaya göre",
-    ]
-
-    evidence = 0.0
-    if any(k in lower for k in evidence_keywords):
-        evidence += 0.5
-    if "http" in lower or "www." in lower:
-        evidence += 0.3
-    if re.search(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b", text):
-        evidence += 0.2
-
-    evidence = _clamp01(evidence)
-
-    # hedge -- uncertainty language
-    hedge_keywords = [
-        "iddia",
-        "iddia edildi",
-        "söyleniyor",
-        "öne sürüldü",
-        "iddialara göre",
-        "iddia ediliyor",
-    ]
-
-    hedge = 1.0 if any(h in lower for h in hedge_keywords) else 0.0
-
-    noise = 1.0 if re.search(r"(.)\1\1", text) else 0.0
-
-    # evidence means REAL >> convert to "fake evidence lack"
-    evidence_for_fake = 1.0 - evidence
-
-    return {
-        "sensationalism": sensationalism,
-        "evidence": evidence_for_fake,
-        "hedge": hedge,
-        "noise": noise,
-    }
+    def __init__(self, bundle=None, cache=None):
+        """
+        bundle: bundle.Bundle (e.g. load_bundle(path)); None >> load_artifacts()
+        cache: prediction_cache.PredictionCache; None >> one for this bundle
+        version from config (PREDICT_CACHE_*)
+        """
+        bundle = load_artifacts() if bundle is None else bundle
+
+        self.vectorizer = bundle.vectorizer
+        self.scaler = bundle.scaler
+        # None for models trained before the thermometer binarizer
+        # (sign binarization inside TsetlinModel)
+        self.binarizer = bundle.binarizer
+        self.tm = bundle.tm
+        # bundle content hash (None: legacy pickles)
+        self.version = bundle.version
+
+        # pyTsetlinMachine keeps per-call buffers on the machine object;
+        # exported clauses (clauses.ClauseModel) are read-only
+        self._tm_lock = (
+            contextlib.nullcontext() if isinstance(self.tm, ClauseModel) else threading.Lock()
+        )
+
+        # results of texts already scored by this model version
+        if cache is None:
+            cache = PredictionCache(self.version)
+            cache.load()
+        self.cache = cache
+
+        get_fuzzy_grid()
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        """result dicts; cached texts are not analyzed again"""
+        return self.cache.cached(texts, self.predict_texts)
+
+    def predict_texts(self, texts):
+        """predict_batch without the result cache"""
+        return self.predict_documents([analyze_text(t) for t in texts])
+
+    def features(self, docs):
+        """TF-IDF + scaled custom + fuzzy score rows (CSR, before binarization)"""
+        X_text = self.vectorizer.transform([d.clean for d in docs])
+        X_custom = self.scaler.transform(custom_features(docs))
+
+        # fuzzy (same spec and batch grid scoring as training)
+        fs = compute_fuzzy_scores(fuzzy_inputs(docs))
+
+        return sparse.hstack([X_text, X_custom, fs[:, None]], format="csr")
+
+    def predict_documents(self, docs):
+        """docs: analysis.Document list >> list of result dicts"""
+        if not docs:
+            return []
+
+        X = self.features(docs)
+        fs = X[:, -1].toarray().ravel()
+
+        if self.binarizer is not None:
+            X = self.binarizer.transform(X)
+
+        # prediction
+        with self._tm_lock:
+            preds, conf = self.tm.scores(X)
+
+        return [
+            {
+                "tm_confidence": float(c),
+                "fuzzy_score": float(f),
+                "label": int(p),
+            }
+            for c, f, p in zip(conf, fs, preds)
+        ]
+
+
+_default_predictor = None
+_default_lock = threading.Lock()
+
+
+def get_predictor():
+    """process-wide Predictor, created on first use"""
+    global _default_predictor
+
+    if _default_predictor is None:
+        with _default_lock:
+            if _default_predictor is None:
+                _default_predictor = Predictor()
+    return _default_predictor
 
 
 def predict_text(text):
@@ -84,40 +125,33 @@ def predict_text(text):
     outputs:
       - TM confidence (0..1)
       - Fuzzy fake_score (0..1)
+      - label (0 = FAKE, 1 = REAL)
     """
 
-    # load artifacts
-    with open(VECTORIZER_PATH, "rb") as f:
-        vectorizer = pickle.load(f)
-
-    with open(SCALER_PATH, "rb") as f:
-        scaler = pickle.load(f)
-
-    tm = TsetlinModel()
-    tm.load(MODEL_PATH)
-
-    # build feature vector
-    clean = preprocess(text)
-    X_text = vectorizer.transform([clean]).toarray()
-    X_custom = scaler.transform(extract_custom_features([text]))
+    predictor = get_predictor()
+    cache = predictor.cache
 
-    X = np.hstack([X_text, X_custom])
+    keys, cached, missing = cache.lookup([text])
+    if cached[0] is not None:
+        print("\n[CACHED] same text already scored by this model")
+        return _print_scores(cached[0])
 
-    # fuzzy
-    fuzzy_inputs = _extract_fuzzy_inputs(text)
+    # text analyzed once, shared by the debug print and the predictor
+    doc = analyze_text(text)
+    fuzzy_inputs = _extract_fuzzy_inputs(doc)
 
     print("\n[FUZZY DEBUG]")
     for k, v in fuzzy_inputs.items():
         print(f"  {k:<15} = {v:.3f}")
 
-    fs = compute_fuzzy_score(fuzzy_inputs)
+    result = cache.fill(keys, cached, missing, predictor.predict_documents([doc]))[0]
+    cache.save()
+    return _print_scores(result)
 
-    # append fuzzy feature
-    X = np.hstack([X, np.array([[fs]])])
 
-    # prediction
-    pred = tm.predict(X)[0]
-    conf = tm.confidence(X)[0]
+def _print_scores(result):
+    fs = result["fuzzy_score"]
+    conf = result["tm_confidence"]
 
     # determine likelihood based on fuzzy score
     fuzzy_likelihood = "likely FAKE" if fs >= 0.5 else "likely REAL"
@@ -130,7 +164,4 @@ def predict_text(text):
 
     print("-" * 50)
 
-    return {
-        "tm_confidence": float(conf),
-        "fuzzy_score": float(fs),
-    }
+    return result
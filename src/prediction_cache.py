@@ -0,0 +1,175 @@
+# prediction results by text
+#
+# syndicated news arrives many times with the same body; a text already
+# scored by this model version skips analysis, vectorization, fuzzy scoring
+# and the Tsetlin machine. the key is a hash of the exact text: case,
+# punctuation, digits, links and even runs of whitespace feed the custom /
+# fuzzy features, so any normalization could return another text's scores.
+# entries are tied to the model bundle version: a cache saved for another
+# version is dropped on load.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import PREDICT_CACHE_PATH, PREDICT_CACHE_SIZE
+
+# stored per entry, in this order
+FIELDS = ("tm_confidence", "fuzzy_score", "label")
+
+# key scheme saved with the cache (files keyed any other way are ignored)
+KEY_SCHEME = "blake2b-128:text"
+
+
+class PredictionCache:
+    """
+    bounded LRU map: text key >> (tm_confidence, fuzzy_score, label).
+    version: model bundle version the results belong to (None: legacy
+    pickles, kept in memory only). path: .npz to load / save (None: memory only)
+    """
+
+    def __init__(self, version, maxsize=None, path=None):
+        self.version = version
+        self.maxsize = PREDICT_CACHE_SIZE if maxsize is None else maxsize
+        self.path = PREDICT_CACHE_PATH if path is None else path
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    @property
+    def persistent(self) -> bool:
+        return self.enabled and bool(self.path) and self.version is not None
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes):
+        """cached result dict (a new one per call) or None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return dict(zip(FIELDS, entry))
+
+    def put(self, key: bytes, result: dict):
+        if not self.enabled:
+            return
+        entry = tuple(result[f] for f in FIELDS)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, texts):
+        """
+        keys, results (None for misses) and the distinct missing texts
+        (key >> text, first occurrence), for fill()
+        """
+        keys = [self.key(t) for t in texts]
+        results = [self.get(k) for k in keys]
+        missing = {}
+        for text, k, r in zip(texts, keys, results):
+            if r is None and k not in missing:
+                missing[k] = text
+        return keys, results, missing
+
+    def fill(self, keys, results, missing, fresh):
+        """store `fresh` (results of the missing texts, in order) and complete `results`"""
+        fresh = dict(zip(missing, fresh))
+        for k, r in fresh.items():
+            self.put(k, r)
+        return [dict(fresh[k]) if r is None else r for k, r in zip(keys, results)]
+
+    def cached(self, texts, compute):
+        """
+        results for `texts`; compute(list of texts) >> result dicts is called
+        once, with the distinct texts that are not cached (skipped if none)
+        """
+        if not self.enabled:
+            return compute(list(texts))
+        keys, results, missing = self.lookup(texts)
+        fresh = compute(list(missing.values())) if missing else []
+        return self.fill(keys, results, missing, fresh)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    # persistence (.npz: entries in LRU order, oldest first, + the model version)
+
+    def load(self) -> int:
+        """read self.path if it was saved for this model version; returns the entries loaded"""
+        if not self.persistent or not os.path.exists(self.path):
+            return 0
+        try:
+            with np.load(self.path) as f:
+                if str(f["version"]) != self.version or str(f["key"]) != KEY_SCHEME:
+                    print(f"Prediction cache {self.path} is for another model version: ignored")
+                    return 0
+                keys = [row.tobytes() for row in f["keys"][-self.maxsize :]]
+                columns = [f[name][-self.maxsize :].tolist() for name in FIELDS]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Prediction cache {self.path} unreadable ({e}): ignored")
+            return 0
+
+        with self._lock:
+            for k, entry in zip(keys, zip(*columns)):
+                self._data[k] = entry
+                self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return len(keys)
+
+    def save(self):
+        """write the entries to self.path (no-op unless persistent)"""
+        if not self.persistent:
+            return
+        with self._lock:
+            keys = list(self._data)
+            entries = list(self._data.values())
+
+        conf, fuzzy, label = (list(c) for c in zip(*entries)) if entries else ([], [], [])
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # write-then-rename so concurrent readers never see a partial file
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                version=np.array(self.version),
+                key=np.array(KEY_SCHEME),
+                # (n, 16) bytes ("S16" would strip trailing NUL bytes)
+                keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16),
+                tm_confidence=np.array(conf, dtype=np.float64),
+                fuzzy_score=np.array(fuzzy, dtype=np.float64),
+                label=np.array(label, dtype=np.int64),
+            )
+        os.replace(tmp, self.path)
@@ -1,29 +1,162 @@
 # Turkish normalization and cleanin
 
+import os
 import re
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from .config import HASH_SEED, LEMMA_CACHE_SIZE
 
 
 _zemberek = None
 _zeyrek = None
 
-try:
-    # zemberek-python (preferred if avail)
-    from zemberek import TurkishMorphology
+# the morphology packages are imported on first use (zemberek alone
+# takes ~0.4 s), not when the module is imported
+_backends_loaded = False
+
+
+def _load_backends():
+    global _zemberek, _zeyrek, _backends_loaded
 
-    _zemberek = TurkishMorphology  # assign class/namespace
-except Exception:
-    _zemberek = None
+    if _backends_loaded:
+        return
+    _backends_loaded = True
 
-if _zemberek is None:
     try:
-        # zeyrek is a pure-Python fallback (lemmatizer + morphology)
-        import zeyrek
-        from zeyrek import MorphAnalyzer
+        # zemberek-python (preferred if avail)
+        from zemberek import TurkishMorphology
 
-        _zeyrek = MorphAnalyzer()
+        _zemberek = TurkishMorphology  # assign class/namespace
     except Exception:
-        _zeyrek = None
+        _zemberek = None
+
+    if _zemberek is None:
+        try:
+            # zeyrek is a pure-Python fallback (lemmatizer + morphology)
+            from zeyrek import MorphAnalyzer
+
+            _zeyrek = MorphAnalyzer
+        except Exception:
+            _zeyrek = None
+
+
+class LemmaCache:
+    """
+    bounded LRU map: surface form >> lemma.
+    shared by the zemberek and zeyrek paths (only one is active per process).
+    """
+
+    def __init__(self, maxsize=LEMMA_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, word: str) -> Optional[str]:
+        with self._lock:
+            lemma = self._data.get(word)
+            if lemma is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(word)
+            self.hits += 1
+            return lemma
+
+    def put(self, word: str, lemma: str):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[word] = lemma
+            self._data.move_to_end(word)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_lemma_cache = LemmaCache()
+
+# analyzer singleton -- loading the zemberek dictionaries takes seconds,
+# so it is created on first use and then reused for the whole process
+_analyzer = None
+_analyzer_failed = False
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer():
+    """return the process-wide morphology analyzer (None if unavailable)"""
+    global _analyzer, _analyzer_failed
+
+    if _analyzer is not None or _analyzer_failed:
+        return _analyzer
+
+    with _analyzer_lock:
+        if _analyzer is None and not _analyzer_failed:
+            _load_backends()
+            try:
+                if _zemberek:
+                    _analyzer = (
+                        _zemberek.create_with_defaults()
+                        if hasattr(_zemberek, "create_with_defaults")
+                        else _zemberek()
+                    )
+                elif _zeyrek:
+                    _analyzer = _zeyrek()
+            except Exception:
+                _analyzer = None
+
+            if _analyzer is None:
+                _analyzer_failed = True
+            elif _zemberek and not hash_seeded():
+                print(
+                    f"Warning: PYTHONHASHSEED is not {HASH_SEED}: zemberek lemmas "
+                    f"differ from run to run (main.py sets it)"
+                )
+
+    return _analyzer
+
+
+def hash_seeded() -> bool:
+    """running under config.HASH_SEED (main.py sets it)"""
+    return os.environ.get("PYTHONHASHSEED") == str(HASH_SEED)
+
+
+def analyzer_name() -> str:
+    """which lemmatizer produces the lemmas (without loading it)"""
+    _load_backends()
+    if _analyzer_failed:
+        return "none"
+    if _zemberek:
+        # other hash seeds give other lemmas: kept apart in the corpus cache
+        return "zemberek" if hash_seeded() else "zemberek-unseeded"
+    if _zeyrek:
+        return "zeyrek"
+    return "none"
+
+
+def lemma_cache_info() -> dict:
+    return _lemma_cache.stats()
+
+
+def clear_lemma_cache():
+    _lemma_cache.clear()
 
 
 def simple_clean(text: str) -> str:
@@ -35,73 +168,71 @@ def simple_clean(text: str) -> str:
     return text
 
 
-def lemmatize_tokens(tokens: List[str]) -> List[str]:
-    if _zemberek:
-        try:
+def _zemberek_lemma(morph, w: str) -> str:
+    try:
+        analyses = (
+            morph.analyze_sentence(w)
+            if hasattr(morph, "analyze_sentence")
+            else morph.analyze(w)
+        )
+        if analyses:
+            item = analyses[0]
+            # zemberek-python: WordAnalysis >> dictionary root of the first
+            # analysis, lowercase ("bakanlığı" >> "bakanlık", "gitti" >> "git";
+            # get_stem() keeps the surface change: "bakanlığ"). no analyses:
+            # unknown word, kept as is. which analyses exist and their order
+            # depend on the string hash seed (config.HASH_SEED)
+            results = getattr(item, "analysis_results", None)
+            if results is not None:
+                return results[0].item.root if results else w.lower()
+            # JVM wrappers: getLemmas()
+            if hasattr(item, "getLemmas"):
+                l = item.getLemmas()
+                return str(l[0]).lower() if l else w.lower()
+            if isinstance(item, str):
+                return item.lower()
+        # never str(item): an analysis dump is not a lemma
+        return w.lower()
+    except Exception:
+        return w.lower()
 
-            morph = (
-                _zemberek.create_with_defaults()
-                if hasattr(_zemberek, "create_with_defaults")
-                else _zemberek()
-            )
-            lemmas = []
-            for w in tokens:
-                try:
-                    analyses = (
-                        morph.analyze_sentence(w)
-                        if hasattr(morph, "analyze_sentence")
-                        else morph.analyze(w)
-                    )
-                    # analyses structure varies; try to extract a lemma-safe field
-                    # if the real API differs, inspect `analyses` and adapt
-                    if analyses:
-                        # best-effort extraction:
-                        item = analyses[0]
-                        # many wrappers return a getLemmas() method or a string
-                        if hasattr(item, "getLemmas"):
-                            l = item.getLemmas()
-                            lemmas.append(l[0] if l else w.lower())
-                        elif isinstance(item, str):
-                            lemmas.append(item.lower())
-                        else:
-                            lemmas.append(str(item).lower())
-                    else:
-                        lemmas.append(w.lower())
-                except Exception:
-                    lemmas.append(w.lower())
-            return lemmas
-        except Exception:
-            pass
 
-    if _zeyrek:
-        try:
-            lemmas = []
-            for w in tokens:
-                res = (
-                    _zeyrek.analyze(w)
-                    if hasattr(_zeyrek, "analyze")
-                    else _zeyrek.lemmatize(w)
-                )
-                # zeyrek.analyze returns list of parses, each parse like (surface, pos, lemma, feats)
-                if res:
-                    # pick first parse's lemma if present
-                    first = res[0]
-                    # different versions return different shapes -- try to find lemma
-                    if isinstance(first, tuple) and len(first) >= 3:
-                        lemmas.append(first[2])
-                    elif isinstance(first, dict) and "lemma" in first:
-                        lemmas.append(first["lemma"])
-                    else:
-                        # some versions return list-of-lists
-                        lemmas.append(str(first).lower())
-                else:
-                    lemmas.append(w.lower())
-            return lemmas
-        except Exception:
-            pass
+def _zeyrek_lemma(morph, w: str) -> str:
+    try:
+        res = morph.analyze(w) if hasattr(morph, "analyze") else morph.lemmatize(w)
+        # zeyrek.analyze returns list of parses, each parse like (surface, pos, lemma, feats)
+        if res:
+            # pick first parse's lemma if present
+            first = res[0]
+            # different versions return different shapes -- try to find lemma
+            if isinstance(first, tuple) and len(first) >= 3:
+                return first[2]
+            elif isinstance(first, dict) and "lemma" in first:
+                return first["lemma"]
+            # some versions return list-of-lists
+            return str(first).lower()
+        return w.lower()
+    except Exception:
+        return w.lower()
+
+
+def lemmatize_tokens(tokens: List[str]) -> List[str]:
+    morph = get_analyzer()
 
     # fb: lowercase tokens
-    return [t.lower() for t in tokens]
+    if morph is None:
+        return [t.lower() for t in tokens]
+
+    lemma_of = _zemberek_lemma if _zemberek else _zeyrek_lemma
+
+    lemmas = []
+    for w in tokens:
+        lemma = _lemma_cache.get(w)
+        if lemma is None:
+            lemma = lemma_of(morph, w)
+            _lemma_cache.put(w, lemma)
+        lemmas.append(lemma)
+    return lemmas
 
 
 def tokenize(text: str) -> List[str]:
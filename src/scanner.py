@@ -0,0 +1,174 @@
+# surface scanner: every counter / flag the custom and fuzzy features need,
+# computed once per document
+#  - character counters (uppercase, aaa-style repeats, date candidates) come
+#    from one flag-table lookup over the text's code points (no regex)
+#  - keyword groups (hedge / source / evidence lists, links) come from one
+#    multi-keyword matcher over the lowercase text
+
+import re
+from typing import FrozenSet, NamedTuple
+
+import numpy as np
+
+# keyword lists, matched on the lowercase text (see feature_spec.py for use)
+KEYWORD_GROUPS = {
+    # custom features
+    "hedge": ["iddia", "söyleniyor", "öne sürüldü", "iddia edildi", "rapor edildi"],
+    "source": ["kaynak", "haber ajansı", "resmi açıklama", "bakanlık", "türkiye", "tdk"],
+    # fuzzy inputs
+    "evidence": [
+        "kaynak",
+        "haber ajansı",
+        "resmi açıklama",
+        "bakanlık",
+        "verilere göre",
+        "rapora göre",
+        "araştırmaya göre",
+    ],
+    "fuzzy_hedge": [
+        "iddia",
+        "iddia edildi",
+        "söyleniyor",
+        "öne sürüldü",
+        "iddialara göre",
+        "iddia ediliyor",
+    ],
+    "link": ["http", "www."],
+}
+
+# only used to confirm a date candidate found by the code point pass
+DATE_PATTERN = re.compile(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b")
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick-style matcher for a fixed set of keyword groups.
+    compile time: keywords are merged into one trie; every keyword that has
+    no other keyword as a prefix becomes an anchor, and each anchor keeps its
+    trie subtree (keywords extending it) plus the output closure
+    keyword >> groups.
+    match time: each anchor is searched once over the text (str.find, C
+    speed); only at anchor hits is the subtree checked in place. a keyword
+    occurrence always starts with an anchor occurrence, so nothing is missed,
+    and lists shared between groups are scanned once instead of per group.
+    """
+
+    def __init__(self, groups):
+        self.groups = {name: list(words) for name, words in groups.items()}
+
+        # output closure: keyword >> every group that contains it
+        self.output = {}
+        for name, words in self.groups.items():
+            for w in words:
+                self.output.setdefault(w, set()).add(name)
+
+        words = sorted(self.output)
+        self.anchors = {}
+        for w in words:
+            anchor = next((a for a in self.anchors if w.startswith(a)), None)
+            if anchor is None:
+                self.anchors[w] = []
+            else:
+                self.anchors[anchor].append(w)
+
+    def keywords(self, lower: str):
+        """set of keywords occurring in `lower`"""
+        found = set()
+        for anchor, longer in self.anchors.items():
+            pos = lower.find(anchor)
+            if pos < 0:
+                continue
+            found.add(anchor)
+
+            todo = list(longer)
+            while todo and pos >= 0:
+                todo = [w for w in todo if not lower.startswith(w, pos)]
+                pos = lower.find(anchor, pos + 1)
+            found.update(w for w in longer if w not in todo)
+        return found
+
+    def match(self, lower: str) -> FrozenSet[str]:
+        """names of the groups with at least one keyword in `lower`"""
+        hits = set()
+        for w in self.keywords(lower):
+            hits |= self.output[w]
+        return frozenset(hits)
+
+
+KEYWORDS = KeywordMatcher(KEYWORD_GROUPS)
+
+
+# per code point flags (Basic Multilingual Plane), built on first use
+_UPPER, _DIGIT, _SEP, _NEWLINE = 1, 2, 4, 8
+_FLAGS = None
+
+
+def _flag_table():
+    global _FLAGS
+    if _FLAGS is None:
+        flags = np.zeros(0x10000, dtype=np.uint8)
+        for i in range(0x10000):
+            c = chr(i)
+            if c.isupper():
+                flags[i] |= _UPPER
+            if c.isdecimal():  # = re \d
+                flags[i] |= _DIGIT
+        flags[[ord(c) for c in "/.-"]] |= _SEP
+        flags[ord("\n")] |= _NEWLINE
+        _FLAGS = flags
+    return _FLAGS
+
+
+def _astral_flags(cp):
+    # rare characters outside the BMP (emoji, math letters): one by one,
+    # digits are assumed so the date candidates stay a superset
+    flags = np.empty(len(cp), dtype=np.uint8)
+    for j, c in enumerate(cp):
+        flags[j] = _DIGIT | (_UPPER if chr(c).isupper() else 0)
+    return flags
+
+
+class Surface(NamedTuple):
+    n_upper: int
+    n_exclam: int
+    n_question: int
+    has_repeat: bool
+    has_date: bool
+    hits: FrozenSet[str]  # KEYWORD_GROUPS names found in the text
+
+
+def scan(text: str, lower: str = None) -> Surface:
+    table = _flag_table()
+
+    cp = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+    if len(cp) and cp.max() >= 0x10000:
+        astral = cp >= 0x10000
+        flags = np.empty(len(cp), dtype=np.uint8)
+        flags[~astral] = table[cp[~astral]]
+        flags[astral] = _astral_flags(cp[astral])
+    else:
+        flags = table[cp]
+
+    # (.)\1\1 -- "." does not match a newline
+    eq = cp[1:] == cp[:-1]
+    has_repeat = bool((eq[1:] & eq[:-1] & (flags[2:] & _NEWLINE == 0)).any())
+
+    # any date needs "digit, separator, digit" followed by a separator or a
+    # digit; the regex only confirms, starting from the first candidate
+    digit = (flags & _DIGIT) != 0
+    sep = (flags & _SEP) != 0
+    cand = digit[:-3] & sep[1:-2] & digit[2:-1] & (sep[3:] | digit[3:])
+    has_date = False
+    if cand.any():
+        first = int(np.argmax(cand))
+        has_date = DATE_PATTERN.search(text, max(first - 1, 0)) is not None
+
+    return Surface(
+        n_upper=int(np.count_nonzero(flags & _UPPER)),
+        n_exclam=text.count("!"),
+        n_question=text.count("?"),
+        has_repeat=has_repeat,
+        has_date=has_date,
+        hits=KEYWORDS.match(text.lower() if lower is None else lower),
+    )
@@ -0,0 +1,450 @@
+# local HTTP inference server (asyncio, standard library only)
+#   POST /predict        {"text": "..."}          >> {"tm_confidence", "fuzzy_score", "label"}
+#   POST /predict_batch  {"texts": ["...", ...]}  >> {"results": [...]}
+#   GET  /health         model version, engine, workers, queue depth
+#   GET  /metrics        request / batch latency percentiles (ms), batch sizes, cache hits
+# the model stays loaded; texts in the prediction cache are answered at once,
+# the others of concurrent requests are queued and collected into
+# micro-batches (up to max_batch texts, waiting at most max_wait for more
+# once a worker is free), and each micro-batch runs Predictor.predict_texts
+# (analysis, vectorization, fuzzy scoring, Tsetlin inference) on the worker
+# pool: one thread when workers <= 1, otherwise worker processes that
+# memory-map the same model bundle.
+
+import asyncio
+import collections
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from .prediction_cache import PredictionCache
+from .predict import Predictor, get_predictor
+from .config import *
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+class LatencyStats:
+    """counts + the last `window` latencies of one endpoint (or of the batches)"""
+
+    def __init__(self, window=None):
+        self._samples = collections.deque(maxlen=window or SERVE_LATENCY_WINDOW)
+        self.count = 0
+        self.errors = 0
+
+    def add(self, seconds, ok=True):
+        self._samples.append(seconds)
+        self.count += 1
+        self.errors += not ok
+
+    def summary(self) -> dict:
+        out = {"count": self.count, "errors": self.errors}
+        if self._samples:
+            ms = np.asarray(self._samples) * 1e3
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            out.update(
+                p50_ms=round(float(p50), 3),
+                p90_ms=round(float(p90), 3),
+                p99_ms=round(float(p99), 3),
+                max_ms=round(float(ms.max()), 3),
+                mean_ms=round(float(ms.mean()), 3),
+            )
+        return out
+
+
+# scored by every worker before the server accepts connections: loads the
+# analyzer / lemma backends and runs each code path once
+_WARM_TEXT = "Resmi verilere göre enflasyon oranı düştü. Kaynak: www.tuik.gov.tr 12.05.2024"
+
+# worker processes: one Predictor each; the prediction cache is the
+# server's, so theirs is disabled
+
+_worker = None
+_warm_barrier = None
+
+
+def _init_worker(barrier):
+    global _worker, _warm_barrier
+    _worker = Predictor(cache=PredictionCache(None, maxsize=0))
+    _warm_barrier = barrier
+
+
+def _warm():
+    _worker.predict_texts([_WARM_TEXT])
+    # one _warm per worker: each call holds its process until all have
+    # arrived, so no process runs two of them and every one gets warmed
+    _warm_barrier.wait(timeout=SERVE_WARM_TIMEOUT_S)
+
+
+def _predict_batch(texts):
+    return _worker.predict_texts(texts)
+
+
+class MicroBatcher:
+    """
+    queue of (text, future); run() forms micro-batches and runs them on the
+    executor, at most `max_inflight` at a time (one per worker). a failing
+    micro-batch is rescored text by text: only the requests whose text fails
+    get the error (HTTP 500)
+    """
+
+    def __init__(self, run_batch, executor, max_batch, max_wait, max_inflight):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_inflight = max_inflight
+
+        self.stats = LatencyStats()
+        self.sizes = collections.Counter()
+        self._pending = collections.deque()
+        self._arrived = asyncio.Event()
+        self._tasks = set()
+
+    @property
+    def queued(self):
+        return len(self._pending)
+
+    async def predict(self, texts):
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._pending.extend(zip(texts, futures))
+        self._arrived.set()
+        # every future is awaited, so a second failing text is not left unretrieved
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    async def _wait(self, timeout=None):
+        # True when texts are queued (waits at most timeout seconds)
+        while not self._pending:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        await self._wait()
+        batch = [self._pending.popleft()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if self._pending:
+                batch.append(self._pending.popleft())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self._wait(remaining):
+                break
+
+        # requests that went away (client disconnected) are not scored
+        return [(t, f) for t, f in batch if not f.done()]
+
+    async def run(self):
+        slots = asyncio.Semaphore(self.max_inflight)
+        while True:
+            # a free worker first: while all are busy the queue keeps
+            # filling, and the next batch takes up to max_batch of it at once
+            await slots.acquire()
+            batch = await self._collect()
+            if not batch:
+                slots.release()
+                continue
+            task = asyncio.create_task(self._dispatch(batch, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch, slots):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        ok = True
+        try:
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.run_batch, [t for t, _ in batch]
+                )
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [e]
+                else:
+                    # one bad text must not fail the other requests of the
+                    # micro-batch: score them one at a time to find it
+                    results = [await self._run_one(t) for t, _ in batch]
+
+            for (_, f), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    ok = False
+                    if not f.done():
+                        f.set_exception(result)
+                elif not f.done():
+                    f.set_result(result)
+        finally:
+            slots.release()
+            self.stats.add(time.perf_counter() - start, ok)
+            self.sizes[len(batch)] += 1
+
+    async def _run_one(self, text):
+        loop = asyncio.get_running_loop()
+        try:
+            return (await loop.run_in_executor(self.executor, self.run_batch, [text]))[0]
+        except Exception as e:
+            return e
+
+
+class InferenceServer:
+    """
+    predictor: warm predict.Predictor (None >> get_predictor()); with
+    workers > 1 it only answers /health, the worker processes load their own
+    """
+
+    def __init__(self, predictor=None, workers=None, max_batch=None, max_wait_ms=None):
+        self.predictor = get_predictor() if predictor is None else predictor
+        self.workers = max(1, SERVE_WORKERS if workers is None else workers)
+        self.max_batch = SERVE_MAX_BATCH if max_batch is None else max_batch
+        self.max_wait = (SERVE_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1e3
+
+        self.requests = {
+            path: LatencyStats() for path in ("/predict", "/predict_batch", "/health", "/metrics")
+        }
+        self._server = None
+        self._executor = None
+        self._batcher = None
+        self._batch_task = None
+        self._started = None
+        # open connections (handler task >> writer), closed by close()
+        self._connections = {}
+
+    async def start(self, host=None, port=None):
+        """load the workers and start listening; returns the bound port"""
+        loop = asyncio.get_running_loop()
+
+        if self.workers > 1:
+            # default start method, as parallel.map_chunks
+            context = multiprocessing.get_context()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(context.Barrier(self.workers),),
+            )
+            run_batch = _predict_batch
+            warm = [loop.run_in_executor(self._executor, _warm) for _ in range(self.workers)]
+            await asyncio.gather(*warm)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            run_batch = self.predictor.predict_texts
+            await loop.run_in_executor(self._executor, run_batch, [_WARM_TEXT])
+
+        self._batcher = MicroBatcher(
+            run_batch, self._executor, self.max_batch, self.max_wait, self.workers
+        )
+        self._batch_task = asyncio.create_task(self._batcher.run())
+
+        self._server = await asyncio.start_server(
+            self._handle,
+            SERVE_HOST if host is None else host,
+            SERVE_PORT if port is None else port,
+        )
+        self._started = time.time()
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # idle keep-alive connections: closing the transport ends their
+        # handlers (EOF) instead of cancelling them mid-read
+        for writer in list(self._connections.values()):
+            writer.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.predictor.cache.save()
+
+    # HTTP
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        except ValueError:
+            raise _HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HttpError(411, "Send a Content-Length body (chunked encoding is not supported)")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise _HttpError(400, "Invalid Content-Length")
+        if length > SERVE_MAX_BODY_BYTES:
+            raise _HttpError(413, f"Body larger than {SERVE_MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        keep_alive = headers.get("connection", "").lower()
+        keep_alive = keep_alive != "close" if version == "HTTP/1.1" else keep_alive == "keep-alive"
+        return method, target.split("?", 1)[0], body, keep_alive
+
+    @staticmethod
+    def _json(body):
+        try:
+            return json.loads(body.decode("utf-8") or "null")
+        except (UnicodeDecodeError, ValueError):
+            raise _HttpError(400, "Body is not valid JSON")
+
+    async def _route(self, method, path, body):
+        if path not in self.requests:
+            raise _HttpError(404, f"No endpoint {path}")
+        expected = "POST" if path.startswith("/predict") else "GET"
+        if method != expected:
+            raise _HttpError(405, f"{path} expects {expected}")
+
+        if path == "/health":
+            return self.health()
+        if path == "/metrics":
+            return self.metrics()
+
+        payload = self._json(body)
+        if path == "/predict":
+            text = payload.get("text") if isinstance(payload, dict) else None
+            if not isinstance(text, str):
+                raise _HttpError(400, 'Expected {"text": "..."}')
+            return (await self._predict([text]))[0]
+
+        texts = payload.get("texts") if isinstance(payload, dict) else None
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise _HttpError(400, 'Expected {"texts": ["...", ...]}')
+        return {"results": await self._predict(texts)}
+
+    async def _predict(self, texts):
+        # cached texts are answered at once, the rest go through the batcher
+        cache = self.predictor.cache
+        keys, results, missing = cache.lookup(texts)
+        fresh = await self._batcher.predict(list(missing.values())) if missing else []
+        return cache.fill(keys, results, missing, fresh)
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _HttpError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, False)
+                    break
+                except ValueError:  # line over the stream limit (64 KiB)
+                    await self._respond(writer, 400, {"error": "Request line or header too long"}, False)
+                    break
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                start = time.perf_counter()
+                try:
+                    status, payload = 200, await self._route(method, path, body)
+                except _HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                await self._respond(writer, status, payload, keep_alive)
+                if path in self.requests:
+                    self.requests[path].add(time.perf_counter() - start, status == 200)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    # endpoints
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "model_version": self.predictor.version,
+            "engine": type(self.predictor.tm).__name__,
+            "workers": self.workers,
+            "queued": self._batcher.queued,
+            "uptime_s": round(time.time() - self._started, 1),
+        }
+
+    def metrics(self) -> dict:
+        sizes = self._batcher.sizes
+        n_batches = sum(sizes.values())
+        return {
+            "uptime_s": round(time.time() - self._started, 1),
+            "requests": {path: stats.summary() for path, stats in self.requests.items()},
+            "batches": {
+                **self._batcher.stats.summary(),
+                "texts": sum(k * v for k, v in sizes.items()),
+                "mean_size": round(sum(k * v for k, v in sizes.items()) / n_batches, 2)
+                if n_batches
+                else 0.0,
+                "max_size": max(sizes, default=0),
+            },
+            "queued": self._batcher.queued,
+            "cache": self.predictor.cache.stats(),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1e3,
+        }
+
+
+def run_server(host=None, port=None, workers=None, max_batch=None, max_wait_ms=None):
+    """serve until interrupted (Ctrl+C)"""
+
+    async def main():
+        server = InferenceServer(None, workers, max_batch, max_wait_ms)
+        bound = await server.start(host, port)
+        print(
+            f"Serving on http://{SERVE_HOST if host is None else host}:{bound} "
+            f"({server.workers} worker(s), max batch {server.max_batch}, "
+            f"max wait {server.max_wait * 1e3:g} ms, model {server.predictor.version})"
+        )
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nServer stopped")
@@ -0,0 +1,250 @@
+# hyperparameter sweep: every combination of a small grid
+#   clauses / T / s (Tsetlin Machine), max_features (TF-IDF), epochs
+# documents are analyzed once (corpus cache); each TF-IDF size is vectorized
+# and binarized once and written as a memory-mapped feature store, which the
+# trials (a process pool) open read-only, so N trials share one copy.
+# results: one row per trial with validation / test accuracy, F1, training time
+# and inference latency (of the INFERENCE_ENGINE that serves the model) >> pick
+# the cheapest model that meets the accuracy bar. trials are ranked and picked
+# on validation accuracy (rows held out of the training split, VALIDATION_SIZE);
+# the test split is only reported, so it stays an unbiased estimate.
+
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score
+
+from .binarize import ThermometerBinarizer
+from .clauses import export_clauses
+from .corpus import load_corpus
+from .data_loader import load_data
+from .feature_store import FeatureStore, save_feature_store
+from .model_tsetlin import TsetlinModel
+from .train import split_features
+from .config import *
+
+# grid keys >> config defaults
+PARAMS = {
+    "max_features": TFIDF_MAX_FEATURES,
+    "clauses": TSETLIN_CLAUSES,
+    "T": TSETLIN_T,
+    "s": TSETLIN_S,
+    "epochs": EPOCHS,
+}
+
+FIELDS = [
+    *PARAMS,
+    "epochs_run",
+    "best_epoch",
+    "val_accuracy",
+    "test_accuracy",
+    "test_f1",
+    "train_s",
+    "infer_us_per_doc",
+    "single_ms",
+]
+
+# single-document predictions timed per trial (median reported)
+SINGLE_CALLS = 50
+
+
+def load_grid(path) -> dict:
+    """
+    YAML (needs pyyaml) or JSON mapping, e.g.
+      dataset: data/raw
+      clauses: [100, 300, 500]
+      T: [10, 15]
+      max_features: [300, 500]
+      target_accuracy: 0.9
+    every PARAMS key takes a value or a list; missing keys use config
+    """
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            grid = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("pyyaml is required for YAML grids (pip install pyyaml, or use .json)")
+            grid = yaml.safe_load(f) or {}
+
+    unknown = set(grid) - set(PARAMS) - {"dataset", "target_accuracy"}
+    if unknown:
+        raise ValueError(f"Unknown sweep keys: {sorted(unknown)} (expected {list(PARAMS)})")
+    return grid
+
+
+def trials(grid):
+    """cartesian product of the grid >> list of PARAMS dicts"""
+    values = []
+    for key, default in PARAMS.items():
+        v = grid.get(key, default)
+        values.append(v if isinstance(v, list) else [v])
+    return [dict(zip(PARAMS, combo)) for combo in itertools.product(*values)]
+
+
+def _build_store(corpus, labels, max_features, directory):
+    X_train, X_test, y_train, y_test, vectorizer, _ = split_features(
+        corpus, labels, max_features
+    )
+    binarizer = ThermometerBinarizer(first_column=len(vectorizer.vocabulary_))
+    save_feature_store(
+        directory,
+        {
+            "X_train": binarizer.fit_transform(X_train),
+            "X_test": binarizer.transform(X_test),
+            "y_train": y_train,
+            "y_test": y_test,
+        },
+        meta={"max_features": max_features, "binarized": True},
+    )
+
+
+def run_trial(store_dir, params) -> dict:
+    """one configuration on a binarized feature store (runs in a worker)"""
+    store = FeatureStore(store_dir)
+    X_train, X_test = store["X_train"], store["X_test"]
+    y_train, y_test = np.asarray(store["y_train"]), np.asarray(store["y_test"])
+
+    tm = TsetlinModel(clauses=params["clauses"], T=params["T"], s=params["s"])
+    tm.checkpoint_path = None  # trials run side by side
+
+    # per-epoch lines of every trial would interleave
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        tm.fit(X_train, y_train, epochs=params["epochs"])
+        train_s = time.perf_counter() - start
+
+    # latency of the engine that serves predictions (INFERENCE_ENGINE)
+    engine = export_clauses(tm) if INFERENCE_ENGINE == "clauses" else tm
+
+    start = time.perf_counter()
+    preds, _ = engine.scores(X_test)
+    infer_s = time.perf_counter() - start
+
+    single = []
+    for i in range(min(SINGLE_CALLS, X_test.shape[0])):
+        start = time.perf_counter()
+        engine.scores(X_test[i : i + 1])
+        single.append(time.perf_counter() - start)
+
+    scored = [h for h in tm.history if h["val_accuracy"] is not None]
+    if not scored:
+        raise ValueError(f"{len(y_train)} training rows leave no validation rows (VALIDATION_SIZE={VALIDATION_SIZE})")
+    best = max(scored, key=lambda h: h["val_accuracy"])
+
+    return {
+        **params,
+        "epochs_run": len(tm.history),
+        "best_epoch": best["epoch"],
+        "val_accuracy": best["val_accuracy"],
+        "test_accuracy": accuracy_score(y_test, preds),
+        "test_f1": f1_score(y_test, preds, average="macro"),
+        "train_s": train_s,
+        "infer_us_per_doc": infer_s / max(len(y_test), 1) * 1e6,
+        "single_ms": float(np.median(single)) * 1e3 if single else float("nan"),
+    }
+
+
+def _fmt(value):
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+
+def _write_results(rows, output):
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows({k: _fmt(r[k]) for k in FIELDS} for r in rows)
+
+
+def _print_table(rows):
+    widths = {k: max(len(k), *(len(_fmt(r[k])) for r in rows)) for k in FIELDS}
+    print("  ".join(k.rjust(widths[k]) for k in FIELDS))
+    for r in rows:
+        print("  ".join(_fmt(r[k]).rjust(widths[k]) for k in FIELDS))
+
+
+def run_sweep(grid_path, workers=None, output=None, use_cache=True):
+    """
+    grid_path: YAML / JSON grid (see load_grid)
+    workers:   concurrent trials (None >> config.N_WORKERS)
+    output:    results CSV (None >> <SWEEP_DIR>/results.csv)
+    """
+
+    if not VALIDATION_SIZE:
+        raise ValueError("--sweep ranks trials on validation accuracy: set VALIDATION_SIZE > 0")
+
+    workers = N_WORKERS if workers is None else workers
+    grid = load_grid(grid_path)
+    todo = trials(grid)
+    output = output or os.path.join(SWEEP_DIR, "results.csv")
+
+    print("Loading data...")
+    df = load_data(grid.get("dataset", DATA_PATH))
+    corpus = load_corpus(df["text"], workers, use_cache)
+
+    # one binarized store per TF-IDF size, shared by all its trials
+    stores = {}
+    for k in sorted({t["max_features"] for t in todo}):
+        stores[k] = os.path.join(SWEEP_DIR, f"features-{k}")
+        print(f"Building features (max_features={k})...")
+        _build_store(corpus, df["label"], k, stores[k])
+    del corpus
+
+    print(f"Running {len(todo)} trials on {workers} worker(s)...")
+    rows = []
+
+    def done(row):
+        rows.append(row)
+        print(
+            f"  [{len(rows)}/{len(todo)}] "
+            + " ".join(f"{k}={row[k]}" for k in PARAMS)
+            + f" >> val acc {row['val_accuracy']:.4f}, test acc {row['test_accuracy']:.4f},"
+            + f" test f1 {row['test_f1']:.4f}, train {row['train_s']:.1f}s"
+        )
+
+    if workers <= 1:
+        for t in todo:
+            done(run_trial(stores[t["max_features"]], t))
+    else:
+        # default start method, as parallel.map_chunks: trials only read
+        # their feature store from disk, nothing in the parent needs isolating
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_trial, stores[t["max_features"]], t) for t in todo]
+            for future in as_completed(futures):
+                done(future.result())
+
+    rows.sort(key=lambda r: (-r["val_accuracy"], r["infer_us_per_doc"]))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    _write_results(rows, output)
+
+    print()
+    _print_table(rows)
+    if workers > 1:
+        print(f"(train / inference times measured with up to {workers} trials running at once)")
+
+    target = grid.get("target_accuracy")
+    if target is not None:
+        ok = [r for r in rows if r["val_accuracy"] >= target]
+        if ok:
+            # cost = clauses x TF-IDF columns (timings are noisy with parallel trials)
+            best = min(ok, key=lambda r: (r["clauses"] * r["max_features"], r["infer_us_per_doc"]))
+            print(
+                f"\nCheapest model with validation accuracy >= {target}: "
+                + ", ".join(f"{k}={best[k]}" for k in PARAMS)
+                + f" ({best['infer_us_per_doc']:.1f} us/doc, validation accuracy {best['val_accuracy']:.4f},"
+                + f" test accuracy {best['test_accuracy']:.4f})"
+            )
+        else:
+            print(f"\nNo configuration reached validation accuracy {target}")
+
+    print(f"\nResults written: {output}")
+    return rows
@@ -0,0 +1,287 @@
+# multiclass Tsetlin Machine in NumPy, bit-packed for inference
+#
+# same learning rules as pyTsetlinMachine's libTM (MultiClassTsetlinMachine
+# with boost_true_positive_feedback=1, 8 state bits, append_negated) and the
+# same duck-typed API (fit / predict / transform / get_state / set_state), so
+# model_tsetlin.TsetlinModel can use either; a libTM state loaded with
+# set_state predicts exactly what libTM predicts.
+#
+# differences from libTM:
+#  - seeded: every class draws from its own np.random.Generator, so a fixed
+#    seed gives the same machine on every run (libTM's C RNG has no seed)
+#  - the classes of a multiclass machine only share the example order and the
+#    negative-class draw; both are drawn up front, after which each class
+#    trains independently
+#  - include / exclude actions are kept as packed uint64 words: clause outputs
+#    are word-wise AND / compare instead of per-literal loops
+#
+# training runs in one process: splitting each class's clauses over worker
+# processes needs a synchronisation per example, and measured slower than
+# pyTsetlinMachine with any worker count (see README)
+
+import numpy as np
+
+STATE_BITS = 8
+INCLUDE = 1 << (STATE_BITS - 1)  # state >= 128 >> include
+MAX_STATE = (1 << STATE_BITS) - 1
+
+# rows per inference block ((rows, clauses) intermediates stay small)
+_BLOCK_ROWS = 512
+
+
+def _literals(X):
+    """0/1 feature rows >> bool literal rows (x then not x, libTM's append_negated)"""
+    X = np.asarray(X) != 0
+    return np.hstack([X, ~X])
+
+
+def _pack(bits, n_words):
+    """bool (rows, literals) >> uint64 (rows, n_words), literal k at bit k % 64"""
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    out = np.zeros((bits.shape[0], n_words * 8), dtype=np.uint8)
+    out[:, : packed.shape[1]] = packed
+    return out.view(np.uint64)
+
+
+def _clause_outputs(include, x):
+    """
+    include (clauses, words), x (rows, words) >> bool (rows, clauses):
+    a clause fires when every included literal is 1
+    """
+    out = np.ones((x.shape[0], include.shape[0]), dtype=bool)
+    for w in range(include.shape[1]):
+        inc = include[:, w]
+        out &= (x[:, w, None] & inc) == inc
+    return out
+
+
+def _update(ta, include, x, out, votes, target, rng, T, threshold, positive):
+    """
+    libTM feedback for one example on one class's clauses (or a slice of them).
+    ta (clauses, literals) uint8 states and include, their packed actions, are
+    updated in place; out: clause outputs, votes: clipped class sum
+    """
+
+    p = (T + (1 - 2 * target) * votes) / (2 * T)
+    feedback = rng.random(len(positive)) <= p
+
+    # target class: Type I on + clauses, Type II on - clauses; other class: reverse
+    type_1 = feedback & (positive if target else ~positive)
+    type_2 = feedback & ~type_1 & out
+
+    changed = []
+
+    rows = np.flatnonzero(type_2)
+    if len(rows):
+        # Type II: include a 0-literal of a firing clause (excluded >> no overflow)
+        block = ta[rows]
+        block += (block < INCLUDE) & ~x
+        ta[rows] = block
+        changed.append(rows)
+
+    rows = np.flatnonzero(type_1)
+    if len(rows):
+        # Type I: firing clause >> reward its 1-literals, forget 0-literals
+        # with p 1/s; silent clause >> forget every literal with p 1/s
+        draw = np.frombuffer(rng.bytes(2 * len(rows) * len(x)), dtype=np.uint16)
+        forget = draw.reshape(len(rows), len(x)) < threshold
+        reward = out[rows, None] & x
+        forget &= ~reward
+
+        block = ta[rows]
+        block += reward & (block < MAX_STATE)
+        block -= forget & (block > 0)
+        ta[rows] = block
+        changed.append(rows)
+
+    if changed:
+        rows = np.concatenate(changed)
+        include[rows] = _pack(ta[rows] >= INCLUDE, include.shape[1])
+
+
+def _threshold(s):
+    # 1/s to 16 bit resolution (libTM compares float draws the same way)
+    return int(round(65536 / s))
+
+
+def _train_class(ta, include, lits, lits_packed, examples, targets, rng, T, s, sign):
+    """libTM tm_update for one class over a schedule of (example, target) pairs"""
+    threshold = _threshold(s)
+    positive = sign > 0
+
+    for l, target in zip(examples, targets):
+        out = _clause_outputs(include, lits_packed[l : l + 1])[0]  # empty >> fires
+        votes = int(np.clip(sign[out].sum(), -T, T))
+        _update(ta, include, lits[l], out, votes, target, rng, T, threshold, positive)
+
+
+class NumpyTsetlinMachine:
+    """
+    drop-in for pyTsetlinMachine.tm.MultiClassTsetlinMachine
+    seed: int (None = unseeded)
+    """
+
+    def __init__(self, number_of_clauses, T, s, number_of_state_bits=8, seed=None):
+        if number_of_state_bits != STATE_BITS:
+            raise ValueError(f"NumpyTsetlinMachine supports {STATE_BITS} state bits only")
+
+        self.number_of_clauses = number_of_clauses
+        self.number_of_state_bits = number_of_state_bits
+        self.T = int(T)
+        self.s = s
+        self.seed = seed
+        self.ta = None
+
+    # shape (same attribute names as libTM's machine)
+
+    @property
+    def number_of_classes(self):
+        return self.ta.shape[0]
+
+    @property
+    def number_of_features(self):
+        return self.ta.shape[2]  # literals (2 x input features)
+
+    @property
+    def number_of_ta_chunks(self):
+        return (self.number_of_features - 1) // 32 + 1
+
+    @property
+    def _sign(self):
+        # libTM clause polarity: even clauses vote +, odd clauses vote -
+        return np.where(np.arange(self.number_of_clauses) % 2 == 0, 1, -1).astype(np.int64)
+
+    def _init(self, n_classes, n_features):
+        n_literals = 2 * n_features
+        self.ta = np.full(
+            (n_classes, self.number_of_clauses, n_literals), INCLUDE - 1, dtype=np.uint8
+        )
+        self._n_words = (n_literals - 1) // 64 + 1
+        self.include = np.zeros((n_classes, self.number_of_clauses, self._n_words), np.uint64)
+        self._repack()
+
+        seeds = np.random.SeedSequence(self.seed).spawn(n_classes + 1)
+        self._rng = np.random.default_rng(seeds[0])  # negative-class draws
+        self._class_rngs = [np.random.default_rng(sq) for sq in seeds[1:]]
+
+    def _repack(self):
+        for c, ta in enumerate(self.ta):
+            self.include[c] = _pack(ta >= INCLUDE, self._n_words)
+        self._nonempty = self.include.any(axis=2)
+
+    def __setstate__(self, state):
+        # machines pickled with clause-slice workers: per slice, per class
+        # generators (slice 0 is the single-process one)
+        if "_rngs" in state:
+            state["_class_rngs"] = state.pop("_rngs")[0]
+        for key in ("workers", "_pool"):
+            state.pop(key, None)
+        self.__dict__.update(state)
+
+    # training
+
+    def _negatives(self, y, epochs):
+        """per epoch: a random class != y (uniform over the others) per example"""
+        k = self.number_of_classes
+        out = []
+        for _ in range(epochs):
+            negative = self._rng.integers(0, k - 1, size=len(y))
+            negative += negative >= y
+            out.append(negative)
+        return out
+
+    def _schedule(self, negatives, y):
+        """per class: (example indices, targets) in libTM update order"""
+        per_class = [([], []) for _ in range(self.number_of_classes)]
+        for negative in negatives:
+            for c, (examples, targets) in enumerate(per_class):
+                pos, neg = y == c, negative == c
+                rows = np.flatnonzero(pos | neg)
+                examples.append(rows)
+                targets.append(pos[rows].astype(np.int64))
+        return [(np.concatenate(e), np.concatenate(t)) for e, t in per_class]
+
+    def fit(self, X, Y, epochs=100, incremental=False):
+        X = np.asarray(X)
+        Y = np.asarray(Y).astype(np.int64)
+
+        if self.ta is None or not incremental:
+            self._init(int(Y.max()) + 1, X.shape[1])
+        if epochs <= 0 or not len(Y):
+            return
+
+        lits = _literals(X)
+        lits_packed = _pack(lits, self._n_words)
+        negatives = self._negatives(Y, epochs)
+
+        sign = self._sign
+        for c, (examples, targets) in enumerate(self._schedule(negatives, Y)):
+            _train_class(
+                self.ta[c], self.include[c], lits, lits_packed, examples, targets,
+                self._class_rngs[c], self.T, self.s, sign,
+            )
+        self._nonempty = self.include.any(axis=2)
+
+    # inference (clauses without literals output 0, as in libTM's predict mode)
+
+    def _outputs(self, X):
+        """bool (rows, classes, clauses)"""
+        x = _pack(_literals(X), self._n_words)
+        out = np.empty((x.shape[0], self.number_of_classes, self.number_of_clauses), dtype=bool)
+        for start in range(0, x.shape[0], _BLOCK_ROWS):
+            block = x[start : start + _BLOCK_ROWS]
+            for c in range(self.number_of_classes):
+                out[start : start + _BLOCK_ROWS, c] = (
+                    _clause_outputs(self.include[c], block) & self._nonempty[c]
+                )
+        return out
+
+    def predict(self, X):
+        votes = np.clip(self._outputs(X) @ self._sign, -self.T, self.T)
+        return votes.argmax(axis=1)
+
+    def transform(self, X, inverted=True):
+        out = self._outputs(X).reshape(len(X), -1)
+        return (~out if inverted else out).astype(np.uint32)
+
+    def get_state(self):
+        return [
+            (np.ones(self.number_of_clauses, dtype=np.uint32), to_libtm_state(ta))
+            for ta in self.ta
+        ]
+
+    def set_state(self, state):
+        """state: libTM get_state() output (or ours); the machine must be shaped"""
+        for c, (_, ta_states) in enumerate(state):
+            self.ta[c] = from_libtm_state(ta_states, self.number_of_clauses, self.number_of_features)
+        self._repack()
+
+
+# libTM state layout: per class (clause weights, ta_states), ta_states are
+# (clauses, ta chunks, state bits) bit planes of 32 literals per uint32
+
+
+def to_libtm_state(ta):
+    """uint8 (clauses, literals) >> libTM ta_states (flat uint32)"""
+    n_clauses, n_literals = ta.shape
+    chunks = (n_literals - 1) // 32 + 1
+    padded = np.zeros((n_clauses, chunks * 32), dtype=np.uint8)
+    padded[:, :n_literals] = ta
+
+    words = np.empty((n_clauses, chunks, STATE_BITS), dtype=np.uint32)
+    for b in range(STATE_BITS):
+        plane = np.packbits((padded >> b) & 1, axis=1, bitorder="little")
+        words[:, :, b] = plane.view("<u4")
+    return words.ravel()
+
+
+def from_libtm_state(ta_states, n_clauses, n_literals):
+    """libTM ta_states (flat uint32) >> uint8 (clauses, literals)"""
+    chunks = (n_literals - 1) // 32 + 1
+    words = np.asarray(ta_states).reshape(n_clauses, chunks, STATE_BITS)
+
+    ta = np.zeros((n_clauses, chunks * 32), dtype=np.uint8)
+    for b in range(STATE_BITS):
+        plane = np.ascontiguousarray(words[:, :, b], dtype="<u4").view(np.uint8)
+        ta |= np.unpackbits(plane, axis=1, bitorder="little") << b
+    return ta[:, :n_literals].copy()
@@ -1,90 +1,170 @@
 # load >> preprocess >> feature >> train >> save model
 
-import re
+import os
 import pickle
+import tempfile
+from collections import Counter
+
 import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.preprocessing import StandardScaler
 
-from .data_loader import load_data
-from .preprocess import preprocess
-from .features import build_features
+from .data_loader import load_data, iter_data_chunks
+from .preprocess import lemma_cache_info
+from .features import build_features, transform_features
+from .corpus import load_corpus, text_hash
+from .feature_store import MANIFEST, FeatureStore, save_feature_store
+from .feature_spec import spec_info
 from .model_tsetlin import TsetlinModel
+from .binarize import ThermometerBinarizer, memory_report
+from .bundle import load_artifacts, save_bundle
 from .config import *
 
 
-def train_pipeline(dataset_path):
+def fuzzy_column(fuzzy_inputs):
+    """(n, 1) fuzzy score column from (n, 4) fuzzy inputs (batch grid scoring)"""
+    from .fuzzy import compute_fuzzy_scores
+
+    return compute_fuzzy_scores(fuzzy_inputs)[:, None]
+
+
+def split_features(corpus, labels, max_features=None):
+    """
+    train/test split (TEST_SIZE, RANDOM_STATE) of an analyzed corpus >>
+    X_train, X_test (TF-IDF + scaled custom + fuzzy score, CSR), y_train,
+    y_test, vectorizer, scaler
+    """
+
+    idx_train, idx_test, y_train, y_test = train_test_split(
+        np.arange(len(corpus)),
+        labels,
+        test_size=TEST_SIZE,
+        random_state=RANDOM_STATE,
+    )
+    train, test = corpus.take(idx_train), corpus.take(idx_test)
+
+    X_train, X_test, vectorizer, scaler = build_features(train, test, max_features)
+
+    X_train_fuzzy = fuzzy_column(train.fuzzy_inputs)
+    X_test_fuzzy = fuzzy_column(test.fuzzy_inputs)
+
+    # append fuzzy score as extra column to features
+    X_train = sparse.hstack([X_train, X_train_fuzzy], format="csr")
+    X_test = sparse.hstack([X_test, X_test_fuzzy], format="csr")
+
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    return X_train, X_test, y_train, y_test, vectorizer, scaler
+
+
+def text_hashes(texts):
+    """(n, 16) uint8 corpus text hashes (blake2b of the exact text)"""
+    return np.frombuffer(b"".join(text_hash(t) for t in texts), dtype=np.uint8).reshape(-1, 16)
+
+
+def train_pipeline(dataset_path, workers=None, use_cache=True):
+    """
+    workers: process count for the per-document stages (None >> config.N_WORKERS)
+    use_cache: reuse lemmas / custom features / fuzzy inputs from the corpus cache
+    """
+
+    if workers is None:
+        workers = N_WORKERS
 
     print("Loading data...")
     df = load_data(dataset_path)
 
-    df["clean"] = df["text"].apply(preprocess)
+    # tokenize + lemmatize + extract every document exactly once (or never, if cached)
+    corpus = load_corpus(df["text"], workers, use_cache)
 
-    X_train_txt, X_test_txt, y_train, y_test = train_test_split(
-        df["clean"], df["label"], test_size=TEST_SIZE, random_state=RANDOM_STATE
-    )
+    if workers <= 1:
+        # (each pool worker keeps its own cache)
+        info = lemma_cache_info()
+        print(
+            f"Lemma cache: {info['size']} entries, "
+            f"hit rate {info['hit_rate']:.1%} ({info['hits']} hits / {info['misses']} misses)"
+        )
 
     print("Building features...")
-    X_train, X_test, vectorizer, scaler = build_features(X_train_txt, X_test_txt)
-
-    from .fuzzy import compute_fuzzy_score
-
-    # compute fuzzy for each sample (train & test) using the same logic used in features.py
-    def build_fuzzy_array(texts):
-        arr = []
-        for t in texts:
-            # derive the same component signals used in fuzzy:
-            # sensationalism ~ cap_ratio + exclam + repeat
-            s = (sum(1 for c in t if c.isupper()) / (len(t) + 1)) + (
-                t.count("!") / (len(t) + 1)
-            )
-            s += 1.0 if re.search(r"(.)\1{2,}", t) else 0.0
-            # evidence ~ source + link + date
-            e = (
-                int(
-                    any(
-                        skw in t.lower()
-                        for skw in [
-                            "kaynak",
-                            "haber ajansı",
-                            "resmi açıklama",
-                            "bakanlık",
-                        ]
-                    )
-                )
-                + int("http" in t.lower() or "www." in t.lower())
-                + (1 if re.search(r"\b\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4}\b", t) else 0)
-            )
-            # hedge ~ hedges
-            h = int(
-                any(
-                    hd in t.lower()
-                    for hd in ["iddia", "söyleniyor", "iddia edildi", "öne sürüldü"]
-                )
-            )
-            # noise ~ repeated char or weird tokens
-            n = 1.0 if re.search(r"(.)\1\1", t) else 0.0
+    X_train, X_test, y_train, y_test, vectorizer, scaler = split_features(
+        corpus, df["label"]
+    )
 
-            score = compute_fuzzy_score(
-                {"sensationalism": s, "evidence": e, "hedge": h, "noise": n}
-            )
-            arr.append([score])
-        return np.array(arr)
+    # text hash per stored row (same split as split_features): --update skips
+    # documents that are already in the store
+    hash_train, hash_test = train_test_split(
+        text_hashes(df["text"]), test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+
+    n_text = len(vectorizer.vocabulary_)
+    save_feature_store(
+        FEATURE_STORE_DIR,
+        {
+            "X_train": X_train,
+            "X_test": X_test,
+            "y_train": y_train,
+            "y_test": y_test,
+            "hash_train": hash_train,
+            "hash_test": hash_test,
+        },
+        meta={
+            "dataset": str(dataset_path),
+            "feature_spec": spec_info(),
+            "columns": {
+                "tfidf": [0, n_text],
+                "custom": [n_text, n_text + scaler.n_features_in_],
+                "fuzzy": [n_text + scaler.n_features_in_, X_train.shape[1]],
+            },
+        },
+        objects={"vectorizer": vectorizer, "scaler": scaler},
+    )
+    print(f"Feature store written: {FEATURE_STORE_DIR}")
 
-    X_train_fuzzy = build_fuzzy_array(X_train_txt)
-    X_test_fuzzy = build_fuzzy_array(X_test_txt)
+    _train_on_features(X_train, X_test, y_train, y_test, vectorizer, scaler)
 
-    # append fuzzy score as extra column to features
-    X_train = np.hstack([X_train, X_train_fuzzy])
-    X_test = np.hstack([X_test, X_test_fuzzy])
+
+def train_from_features(store_dir=None):
+    """
+    skip loading / preprocessing / vectorization: train on the matrices of
+    a feature store (memory-mapped) with the vectorizer/scaler they came from
+    """
+
+    store = FeatureStore(store_dir or FEATURE_STORE_DIR)
+    print(f"Using feature store {store.directory} (dataset: {store.meta.get('dataset')})")
+
+    _train_on_features(
+        store["X_train"],
+        store["X_test"],
+        store["y_train"],
+        store["y_test"],
+        store.load_object("vectorizer"),
+        store.load_object("scaler"),
+    )
+
+
+def _train_on_features(X_train, X_test, y_train, y_test, vectorizer, scaler):
+    # binarize once; fit / predict / confidence all reuse the uint8 literals
+    # (thermometer thresholds are fitted on the training split only)
+    binarizer = ThermometerBinarizer(first_column=len(vectorizer.vocabulary_))
+    X_train_bin = binarizer.fit_transform(X_train)
+    X_test_bin = binarizer.transform(X_test)
+    print(f"Train input: {memory_report(X_train_bin)}")
+    print(f"Test input:  {memory_report(X_test_bin)}")
 
     print("Training Tsetlin Machine...")
     tm = TsetlinModel()
-    tm.fit(X_train, y_train)
+    tm.fit(X_train_bin, y_train)
+
+    preds = tm.predict(X_test_bin)
+    conf = tm.confidence(X_test_bin)
+
+    _report(y_test, preds, conf)
+    _save_artifacts(tm, vectorizer, scaler, binarizer)
 
-    preds = tm.predict(X_test)
-    conf = tm.confidence(X_test)
 
+def _report(y_test, preds, conf):
     print("\nClassification Report:")
     print(classification_report(y_test, preds))
 
@@ -94,13 +174,368 @@ def train_pipeline(dataset_path):
     print("\nConfidence Scores:")
     print(conf)
 
+
+def _save_artifacts(tm, vectorizer, scaler, binarizer):
     print("Saving model...")
-    tm.save(MODEL_PATH)
+    version = save_bundle(MODEL_BUNDLE_DIR, tm, vectorizer, scaler, binarizer)
+    print(f"Model bundle written: {MODEL_BUNDLE_DIR} (version {version})")
+
+    print("Training complete.")
 
-    with open(VECTORIZER_PATH, "wb") as f:
-        pickle.dump(vectorizer, f)
 
-    with open(SCALER_PATH, "wb") as f:
-        pickle.dump(scaler, f)
+# incremental update: new labeled documents, frozen feature space
 
-    print("Training complete.")
+
+def _replay_store(vectorizer, scaler):
+    """the feature store, if its matrices were built with this vectorizer / scaler"""
+    if not os.path.exists(os.path.join(FEATURE_STORE_DIR, "manifest.json")):
+        print(f"No feature store at {FEATURE_STORE_DIR}: updating on the new documents only")
+        return None
+
+    store = FeatureStore(FEATURE_STORE_DIR)
+    if store.load_object("vectorizer").vocabulary_ != vectorizer.vocabulary_ or not np.array_equal(
+        store.load_object("scaler").mean_, scaler.mean_
+    ):
+        print(f"Feature store {FEATURE_STORE_DIR} belongs to another model: not replayed / not extended")
+        return None
+    return store
+
+
+def _accuracy(preds, y):
+    return float(np.mean(preds == y)) if len(y) else float("nan")
+
+
+def update_pipeline(dataset_path, workers=None, use_cache=True, epochs=None):
+    """
+    continue training the saved model on new labeled documents.
+    the vectorizer / scaler / binarizer stay frozen (new documents are mapped
+    into the existing feature space) and the Tsetlin Machine keeps its state:
+    UPDATE_EPOCHS incremental passes over the new training rows plus the
+    UPDATE_RECENT_ROWS most recent training rows of the feature store.
+    the new rows are appended to the store afterwards, so the next update
+    replays them and --from-features retrains on everything. documents whose
+    text is already in the store are skipped (a store without text hashes,
+    from before they were kept: a dataset already listed in its updates is
+    rejected instead).
+    """
+
+    if workers is None:
+        workers = N_WORKERS
+
+    # load_artifacts reads the bundle, else the pickles of an older model;
+    # either must have thermometer thresholds (the pickles: BINARIZER_PATH)
+    manifest = os.path.join(MODEL_BUNDLE_DIR, MANIFEST)
+    if not os.path.exists(manifest) and not os.path.exists(BINARIZER_PATH):
+        raise FileNotFoundError(
+            f"No model bundle ({manifest} not found): --update needs a model trained with --train"
+        )
+
+    # writable arrays: the machine keeps training
+    tm, vectorizer, scaler, binarizer, version, _ = load_artifacts(mmap_mode=None, engine="tm")
+    print(f"Updating model {version or MODEL_PATH}")
+
+    print("Loading new data...")
+    df = load_data(dataset_path)
+    hashes = text_hashes(df["text"])
+
+    store = _replay_store(vectorizer, scaler)
+    if store is not None and "hash_train" in store:
+        stored = {
+            row.tobytes() for name in ("hash_train", "hash_test") for row in np.asarray(store[name])
+        }
+        new = np.array([row.tobytes() not in stored for row in hashes], dtype=bool)
+        if not new.all():
+            print(f"Skipping {int((~new).sum())} of {len(df)} documents already in {FEATURE_STORE_DIR}")
+            df, hashes = df[new].reset_index(drop=True), hashes[new]
+    elif store is not None:
+        seen = [store.meta.get("dataset")] + [u["dataset"] for u in store.meta.get("updates", [])]
+        if str(dataset_path) in seen:
+            print(
+                f"{dataset_path} is already in {FEATURE_STORE_DIR} (store without text hashes: "
+                f"retrain with --train to skip duplicates per document). Nothing to update."
+            )
+            return
+
+    if len(df) < 2:
+        print(f"{len(df)} new document(s): nothing to update (a train / test split needs 2)")
+        return
+
+    corpus = load_corpus(df["text"], workers, use_cache)
+    labels = np.asarray(df["label"])
+
+    idx_train, idx_test = train_test_split(
+        np.arange(len(corpus)), test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+
+    # same columns as train_pipeline, with the fitted vectorizer / scaler
+    def frozen(idx):
+        part = corpus.take(idx)
+        X = sparse.hstack(
+            [transform_features(part, vectorizer, scaler), fuzzy_column(part.fuzzy_inputs)],
+            format="csr",
+        )
+        return X, labels[idx]
+
+    X_new, y_new = frozen(idx_train)
+    X_new_test, y_new_test = frozen(idx_test)
+
+    X_fit, y_fit = X_new, y_new
+    X_old_test, y_old_test = X_new_test[:0], y_new_test[:0]
+
+    if store is not None:
+        n_train, n_test = store["X_train"].shape[0], store["X_test"].shape[0]
+        recent = slice(max(n_train - UPDATE_RECENT_ROWS, 0), n_train)
+        X_fit = sparse.vstack([store["X_train"][recent], X_new], format="csr")
+        y_fit = np.concatenate([store["y_train"][recent], y_new])
+
+        # recent test rows: does the update forget what the model knew?
+        recent_test = slice(max(n_test - UPDATE_RECENT_ROWS, 0), n_test)
+        X_old_test, y_old_test = store["X_test"][recent_test], store["y_test"][recent_test]
+        print(f"Replaying {recent.stop - recent.start} recent training rows from {FEATURE_STORE_DIR}")
+
+    X_fit_bin = binarizer.transform(X_fit)
+    X_new_test_bin = binarizer.transform(X_new_test)
+    X_old_test_bin = binarizer.transform(X_old_test)
+
+    before_new = _accuracy(tm.predict(X_new_test_bin), y_new_test)
+    before_old = _accuracy(tm.predict(X_old_test_bin), y_old_test)
+
+    print(
+        f"Updating Tsetlin Machine: {len(y_fit)} rows ({len(y_new)} new), "
+        f"{UPDATE_EPOCHS if epochs is None else epochs} epochs..."
+    )
+    tm.update(X_fit_bin, y_fit, epochs)
+
+    preds = tm.predict(X_new_test_bin)
+    _report(y_new_test, preds, tm.confidence(X_new_test_bin))
+    print(f"\nAccuracy, new test rows:    {before_new:.3f} >> {_accuracy(preds, y_new_test):.3f}")
+    if store is not None:
+        after_old = _accuracy(tm.predict(X_old_test_bin), y_old_test)
+        print(f"Accuracy, recent test rows: {before_old:.3f} >> {after_old:.3f}")
+
+    print("Saving model...")
+    version = save_bundle(MODEL_BUNDLE_DIR, tm, vectorizer, scaler, binarizer)
+    print(f"Model bundle written: {MODEL_BUNDLE_DIR} (version {version})")
+
+    if store is not None:
+        meta = dict(store.meta)
+        meta["updates"] = meta.get("updates", []) + [
+            {"dataset": str(dataset_path), "train_rows": len(y_new), "test_rows": len(y_new_test)}
+        ]
+        arrays = {
+            "X_train": sparse.vstack([store["X_train"], X_new], format="csr"),
+            "X_test": sparse.vstack([store["X_test"], X_new_test], format="csr"),
+            "y_train": np.concatenate([store["y_train"], y_new]),
+            "y_test": np.concatenate([store["y_test"], y_new_test]),
+        }
+        if "hash_train" in store:
+            arrays["hash_train"] = np.concatenate([store["hash_train"], hashes[idx_train]])
+            arrays["hash_test"] = np.concatenate([store["hash_test"], hashes[idx_test]])
+        save_feature_store(
+            FEATURE_STORE_DIR,
+            arrays,
+            meta=meta,
+            objects={"vectorizer": vectorizer, "scaler": scaler},
+        )
+        print(f"Feature store extended: {FEATURE_STORE_DIR}")
+
+    print("Update complete.")
+
+
+# streaming training: memory bounded by the chunk size, not the corpus
+
+
+class _TermStats:
+    """corpus term / document frequencies, accumulated chunk by chunk"""
+
+    def __init__(self):
+        self.tf = Counter()
+        self.df = Counter()
+        self.n_docs = 0
+
+    def update(self, clean_texts):
+        if not len(clean_texts):
+            return
+        cv = CountVectorizer()
+        try:
+            counts = cv.fit_transform(clean_texts)
+        except ValueError:  # chunk without any token
+            self.n_docs += len(clean_texts)
+            return
+        tf = np.asarray(counts.sum(axis=0)).ravel()
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        for term, j in cv.vocabulary_.items():
+            self.tf[term] += int(tf[j])
+            self.df[term] += int(df[j])
+        self.n_docs += len(clean_texts)
+
+    def vectorizer(self, max_features):
+        """
+        TfidfVectorizer equal to fit() on all counted documents:
+        top max_features terms by corpus frequency (same argsort over the
+        alphabetical term array as sklearn, so ties resolve identically),
+        smoothed idf = ln((1 + n) / (1 + df)) + 1
+        """
+        terms = sorted(self.tf)
+        tf = np.array([self.tf[t] for t in terms])
+        keep = np.sort((-tf).argsort()[:max_features])
+        vocab = {terms[j]: i for i, j in enumerate(keep)}
+
+        df = np.array([self.df[terms[j]] for j in keep], dtype=np.float64)
+        vectorizer = TfidfVectorizer(max_features=max_features, vocabulary=vocab)
+        vectorizer.idf_ = np.log((1 + self.n_docs) / (1 + df)) + 1
+        return vectorizer
+
+
+class _Reservoir:
+    """uniform sample of at most `size` rows from a stream (algorithm R)"""
+
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.rows = None
+        self.seen = 0
+
+    def add(self, block):
+        if not len(block):
+            return
+        if self.rows is None:
+            self.rows = np.empty((0, block.shape[1]))
+
+        free = self.size - len(self.rows)
+        if free > 0:
+            self.rows = np.vstack([self.rows, block[:free]])
+            self.seen += len(block[:free])
+            block = block[free:]
+
+        # row t (0-based stream index) replaces a random slot with prob size/(t+1)
+        t = self.seen + np.arange(len(block))
+        slot = (self.rng.random_sample(len(block)) * (t + 1)).astype(np.int64)
+        hit = slot < self.size
+        self.rows[slot[hit]] = block[hit]
+        self.seen += len(block)
+
+
+def _dump(path, obj):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def train_pipeline_stream(dataset_path, workers=None, chunk_size=None, use_cache=True):
+    """
+    chunked variant of train_pipeline for corpora larger than RAM.
+      pass 1: analyze each chunk once >> term stats, scaler.partial_fit,
+              binarizer sample; lemmas + raw features spilled to disk
+      pass 2: vectorize + scale + binarize each chunk >> uint8 spill files
+      train:  every epoch streams the train chunks (shuffled order / rows),
+              then scores the VALIDATION_SIZE held-out rows (early stopping)
+    the split is a seeded per-row draw (TEST_SIZE), thermometer thresholds
+    come from a BINARIZER_SAMPLE_ROWS reservoir sample of the training rows.
+    only labels / predictions of the test rows are kept for the report.
+    """
+
+    if workers is None:
+        workers = N_WORKERS
+
+    rng = np.random.RandomState(RANDOM_STATE)
+    terms = _TermStats()
+    scaler = StandardScaler()
+    sample = _Reservoir(BINARIZER_SAMPLE_ROWS, rng)
+    n_classes = 0
+
+    with tempfile.TemporaryDirectory(prefix="tm-stream-", dir=STREAM_TMP_DIR) as tmp:
+        print("Pass 1: analyzing chunks...")
+        raw_paths = []
+        for i, df in enumerate(iter_data_chunks(dataset_path, chunk_size)):
+            corpus = load_corpus(df["text"], workers, use_cache)
+            clean, custom = corpus.clean, corpus.custom
+            fuzzy = fuzzy_column(corpus.fuzzy_inputs)
+            del corpus
+
+            labels = df["label"].to_numpy().astype(np.int64)
+            train = rng.random_sample(len(labels)) >= TEST_SIZE
+
+            terms.update([c for c, t in zip(clean, train) if t])
+            if train.any():
+                scaler.partial_fit(custom[train])
+            sample.add(np.hstack([custom[train], fuzzy[train]]))
+            n_classes = max(n_classes, int(labels.max()) + 1)
+
+            path = os.path.join(tmp, f"raw_{i}.pkl")
+            _dump(path, (clean, custom, fuzzy, labels, train))
+            raw_paths.append(path)
+            print(f"  chunk {i}: {len(labels)} rows ({int(train.sum())} train)")
+
+        if terms.n_docs == 0:
+            raise ValueError("No training rows in dataset")
+
+        vectorizer = terms.vectorizer(TFIDF_MAX_FEATURES)
+        n_custom = len(scaler.mean_)
+        tail = sample.rows.copy()
+        tail[:, :n_custom] = scaler.transform(tail[:, :n_custom])
+        binarizer = ThermometerBinarizer(first_column=len(vectorizer.vocabulary_))
+        binarizer.fit_tail(tail)
+
+        print("Pass 2: building binarized chunks...")
+        train_parts, val_parts, test_parts = [], [], []
+        for i, path in enumerate(raw_paths):
+            clean, custom, fuzzy, labels, train = _load(path)
+            os.remove(path)
+
+            X = sparse.hstack(
+                [vectorizer.transform(clean), scaler.transform(custom), fuzzy],
+                format="csr",
+            )
+            X_bin = binarizer.transform(X)
+
+            # per-epoch validation rows (held out of the Tsetlin Machine only)
+            val = train & (rng.random_sample(len(labels)) < VALIDATION_SIZE)
+
+            for mask, parts, name in (
+                (train & ~val, train_parts, "train"),
+                (val, val_parts, "val"),
+                (~train, test_parts, "test"),
+            ):
+                if mask.any():
+                    base = os.path.join(tmp, f"{name}_{i}")
+                    sparse.save_npz(base + ".npz", X_bin[mask], compressed=False)
+                    np.save(base + ".npy", labels[mask])
+                    parts.append(base)
+
+        def batches(epoch):
+            for c in rng.permutation(len(train_parts)):
+                X_c = sparse.load_npz(train_parts[c] + ".npz")
+                y_c = np.load(train_parts[c] + ".npy")
+                order = rng.permutation(len(y_c))
+                for start in range(0, len(y_c), TM_BATCH_SIZE):
+                    idx = np.sort(order[start : start + TM_BATCH_SIZE])
+                    yield X_c[idx], y_c[idx]
+
+        def validation():
+            for base in val_parts:
+                yield sparse.load_npz(base + ".npz"), np.load(base + ".npy")
+
+        print("Training Tsetlin Machine...")
+        tm = TsetlinModel()
+        tm.fit_batches(
+            batches,
+            binarizer.n_literals,
+            n_classes,
+            validation=validation if val_parts else None,
+        )
+
+        y_test, preds, conf = [], [], []
+        for base in test_parts:
+            X_c = sparse.load_npz(base + ".npz")
+            y_test.append(np.load(base + ".npy"))
+            preds.append(tm.predict(X_c))
+            conf.append(tm.confidence(X_c))
+
+    if y_test:
+        _report(np.concatenate(y_test), np.concatenate(preds), np.concatenate(conf))
+    _save_artifacts(tm, vectorizer, scaler, binarizer)
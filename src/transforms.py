@@ -0,0 +1,166 @@
+# fitted TF-IDF / scaler transforms without sklearn
+#
+# prediction only applies a vectorizer and a scaler that training already
+# fitted; importing sklearn for that costs ~1.5 s of cold start (scipy.stats,
+# pandas). the bundle rebuilds them as the classes below, which apply the
+# same arithmetic in the same order as sklearn 1.x (TfidfVectorizer.transform,
+# StandardScaler.transform), so the feature rows are bitwise identical.
+# vectorizer settings these classes do not cover fall back to sklearn.
+
+import re
+
+import numpy as np
+from scipy import sparse
+
+# TfidfVectorizer parameters (as stored by bundle._json_params) this module
+# reproduces; every other value must match sklearn's default
+_TFIDF_DEFAULTS = {
+    "analyzer": "word",
+    "binary": False,
+    "decode_error": "strict",
+    "dtype": "float64",
+    "encoding": "utf-8",
+    "input": "content",
+    "lowercase": True,
+    "ngram_range": [1, 1],
+    "preprocessor": None,
+    "stop_words": None,
+    "strip_accents": None,
+    "tokenizer": None,
+    "use_idf": True,
+}
+# used while fitting only
+_TFIDF_FIT_ONLY = ("max_df", "min_df", "max_features", "smooth_idf")
+
+
+def tfidf_supported(params) -> bool:
+    """can FittedTfidf reproduce a TfidfVectorizer with these parameters?"""
+    rest = set(params) - set(_TFIDF_DEFAULTS) - set(_TFIDF_FIT_ONLY)
+    return (
+        all(params.get(k) == v for k, v in _TFIDF_DEFAULTS.items())
+        and rest <= {"norm", "sublinear_tf", "token_pattern"}
+        and params.get("norm") in ("l2", None)
+    )
+
+
+class FittedTfidf:
+    """
+    TfidfVectorizer.transform of a fitted vectorizer.
+    params: get_params() output (tfidf_supported); terms: vocabulary in column order
+    """
+
+    def __init__(self, params, terms, idf):
+        self.params = dict(params)
+        self.vocabulary_ = {t: i for i, t in enumerate(terms)}
+        self.idf_ = np.asarray(idf)
+        self._terms = terms
+        self._token = re.compile(params["token_pattern"]) if params.get("token_pattern") else None
+
+    def get_params(self, deep=True):
+        return dict(self.params)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self._terms, dtype=object)
+
+    def _tokens(self, doc):
+        # lowercase preprocessor + token_pattern (first group if it has one)
+        return self._token.findall(doc.lower())
+
+    def transform(self, raw_documents):
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+
+        vocabulary = self.vocabulary_
+        indices, counts, indptr = [], [], [0]
+        for doc in raw_documents:
+            counter = {}
+            for token in self._tokens(doc):
+                j = vocabulary.get(token)
+                if j is not None:
+                    counter[j] = counter.get(j, 0) + 1
+            indices.extend(counter)
+            counts.extend(counter.values())
+            indptr.append(len(indices))
+
+        X = sparse.csr_matrix(
+            (
+                np.asarray(counts, dtype=np.float64),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int32),
+            ),
+            shape=(len(indptr) - 1, len(vocabulary)),
+        )
+        X.sort_indices()
+
+        if self.params.get("sublinear_tf"):
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X.data *= self.idf_[X.indices]
+
+        if self.params.get("norm") == "l2":
+            _normalize_rows_l2(X)
+        return X
+
+    def to_sklearn(self):
+        """the equivalent fitted sklearn TfidfVectorizer"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        params = dict(
+            self.params,
+            dtype=np.dtype(self.params["dtype"]),
+            ngram_range=tuple(self.params["ngram_range"]),
+        )
+        vectorizer = TfidfVectorizer(**params, vocabulary=dict(self.vocabulary_))
+        vectorizer.idf_ = np.array(self.idf_)
+        return vectorizer
+
+
+def _normalize_rows_l2(X):
+    # sklearn's inplace_csr_row_normalize_l2: per row, a left-to-right sum of
+    # squares (same rounding as its C loop), rows without entries untouched
+    norms = np.ones(X.shape[0])
+    for i in range(X.shape[0]):
+        total = 0.0
+        for v in X.data[X.indptr[i] : X.indptr[i + 1]].tolist():
+            total += v * v
+        if total != 0.0:
+            norms[i] = np.sqrt(total)
+    X.data /= np.repeat(norms, np.diff(X.indptr))
+
+
+class FittedScaler:
+    """StandardScaler.transform of a fitted scaler"""
+
+    def __init__(self, params, mean, scale, var, n_samples_seen):
+        self.params = dict(params)
+        self.mean_, self.scale_, self.var_ = mean, scale, var
+        self.n_features_in_ = len(mean)
+        self.n_samples_seen_ = n_samples_seen
+
+    def get_params(self, deep=True):
+        return dict(self.params)
+
+    def transform(self, X):
+        X = np.asarray(X)
+        X = np.array(X, dtype=X.dtype if X.dtype in (np.float32, np.float64) else np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1]} features, but the scaler is expecting {self.n_features_in_}"
+            )
+        if self.params.get("with_mean", True):
+            X -= self.mean_
+        if self.params.get("with_std", True):
+            X /= self.scale_
+        return X
+
+    def to_sklearn(self):
+        """the equivalent fitted sklearn StandardScaler"""
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler(**self.params)
+        scaler.mean_, scaler.scale_, scaler.var_ = (
+            np.array(self.mean_), np.array(self.scale_), np.array(self.var_)
+        )
+        scaler.n_features_in_ = self.n_features_in_
+        scaler.n_samples_seen_ = self.n_samples_seen_
+        return scaler
@@ -0,0 +1,111 @@
+# cold-start benchmark: wall time of fresh interpreters running
+#   python main.py --help                 (argument parsing only)
+#   python -c "import src.predict"        (serving imports)
+#   python main.py --predict TEXT         (one-off prediction, needs a trained model)
+#   python -m tools.bench_startup [--repeat N] [--importtime] [--log CSV] [--max-seconds S]
+# --importtime lists the slowest imports of the --predict run; --log appends
+# one row per command (to track cold start across commits); --max-seconds
+# exits with status 1 when the median --predict time is above S
+
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from src.config import MODEL_BUNDLE_DIR, MODEL_PATH
+
+TEXT = "ŞOK! Gizli deneyde insanlar görünmez oldu!!!"
+
+COMMANDS = {
+    "help": [sys.executable, "main.py", "--help"],
+    "import predict": [sys.executable, "-c", "import src.predict"],
+    "predict": [sys.executable, "main.py", "--predict", TEXT],
+}
+
+
+def _run(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _slowest_imports(cmd, top=15):
+    # -X importtime: "import time: self [us] | cumulative | imported package"
+    out = subprocess.run(
+        [cmd[0], "-X", "importtime", *cmd[1:]], capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in out.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--log", default=None, help="append results to this CSV")
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    commands = dict(COMMANDS)
+    if not (os.path.exists(MODEL_BUNDLE_DIR) or os.path.exists(MODEL_PATH)):
+        print(f"No trained model ({MODEL_BUNDLE_DIR}): skipping --predict")
+        del commands["predict"]
+
+    print(f"\nCold start, {args.repeat} runs each (fresh interpreter per run)\n")
+    results = {}
+    for name, cmd in commands.items():
+        _run(cmd)  # warm the OS page cache, not the interpreter
+        times = [_run(cmd) for _ in range(args.repeat)]
+        results[name] = times
+        print(
+            f"  {name:<16} median {statistics.median(times):6.3f}s  "
+            f"min {min(times):6.3f}s  max {max(times):6.3f}s"
+        )
+
+    if args.importtime:
+        name = "predict" if "predict" in commands else "import predict"
+        print(f"\nSlowest imports ({name}, cumulative)")
+        for us, module in _slowest_imports(commands[name]):
+            print(f"  {us / 1e3:8.1f} ms {module}")
+
+    if args.log:
+        new = not os.path.exists(args.log)
+        with open(args.log, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(["time", "commit", "command", "median_s", "min_s", "runs"])
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+            for name, times in results.items():
+                writer.writerow(
+                    [stamp, _git_rev(), name, f"{statistics.median(times):.4f}",
+                     f"{min(times):.4f}", len(times)]
+                )
+        print(f"\nLogged to {args.log}")
+
+    if args.max_seconds is not None and "predict" in results:
+        median = statistics.median(results["predict"])
+        if median > args.max_seconds:
+            print(f"\n--predict cold start {median:.3f}s is above {args.max_seconds:.3f}s")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# model bundle check: the bundle must predict exactly what the pickled
+# objects it replaces predict, and load faster
+#   python -m tools.check_bundle [bundle_dir] [--repeat N] [--dataset PATH --limit N]
+# writes the equivalent loose pickles to a temp dir, times loading both ways
+# (bundle as a trainable TsetlinModel and as exported clauses) and compares
+# predictions / confidences; exits with status 1 on any mismatch
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.analysis import analyze_text
+from src.bundle import Bundle, load_bundle
+from src.config import INFERENCE_ENGINE, MODEL_BUNDLE_DIR, TM_BACKEND
+from src.data_loader import load_data
+from src.model_tsetlin import TsetlinModel
+from src.predict import Predictor
+
+samples = [
+    "Sağlık Bakanlığı yeni aşı kampanyasını duyurdu.",
+    "Resmi verilere göre enflasyon oranı düştü. Kaynak: www.tuik.gov.tr 12.05.2024",
+    "ŞOK! Gizli deneyde insanlar görünmez oldu!!!",
+    "Uzaylılar Ankara üzerinde görüldü iddiası!!! Söyleniyor ki çoook yakında...",
+    "",
+]
+
+NAMES = ("tm", "vectorizer", "scaler", "binarizer")
+
+
+def _write_pickles(bundle, directory):
+    # what training wrote before the bundle: the machine and sklearn objects
+    for name in NAMES:
+        obj = getattr(bundle, name)
+        if name == "tm":
+            obj = obj.model
+        elif hasattr(obj, "to_sklearn"):
+            obj = obj.to_sklearn()
+        with open(os.path.join(directory, f"{name}.pkl"), "wb") as f:
+            pickle.dump(obj, f)
+
+
+def _load_pickles(directory):
+    objs = {}
+    for name in NAMES:
+        with open(os.path.join(directory, f"{name}.pkl"), "rb") as f:
+            objs[name] = pickle.load(f)
+    tm = TsetlinModel()
+    tm.model = objs["tm"]
+    return Bundle(tm, objs["vectorizer"], objs["scaler"], objs["binarizer"], None, {})
+
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bundle_dir", nargs="?", default=MODEL_BUNDLE_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dataset", default=None, help="also compare on these documents")
+    parser.add_argument("--limit", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = list(samples)
+    if args.dataset:
+        texts += load_data(args.dataset)["text"].tolist()[: args.limit]
+
+    bundle = load_bundle(args.bundle_dir)
+    print(
+        f"\nBundle {args.bundle_dir} version {bundle.version}, "
+        f"engine {INFERENCE_ENGINE}, backend {TM_BACKEND}\n"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_pickles(load_bundle(args.bundle_dir, engine="tm"), tmp)
+        t_pickle = _best_of(lambda: _load_pickles(tmp), args.repeat)
+        legacy = _load_pickles(tmp)
+
+    print(f"  {'load pickles:':<38}{t_pickle * 1e3:8.2f} ms")
+    for engine in ("tm", "clauses"):
+        for verify in (True, False):
+            t = _best_of(
+                lambda: load_bundle(args.bundle_dir, verify=verify, engine=engine), args.repeat
+            )
+            label = f"load bundle, {engine} ({'hash verified' if verify else 'no verify'}):"
+            print(f"  {label:<38}{t * 1e3:8.2f} ms")
+    print()
+
+    ok = True
+    new, old = Predictor(bundle), Predictor(legacy)
+    docs = [analyze_text(t) for t in texts]
+    same = np.array_equal(new.features(docs).toarray(), old.features(docs).toarray())
+    print(f"  {'OK  ' if same else 'FAIL'} feature rows: bundle == pickles ({len(docs)} texts)")
+    ok &= same
+
+    a = new.predict_documents(docs)
+    b = old.predict_documents(docs)
+    for name in ("label", "tm_confidence", "fuzzy_score"):
+        same = np.array_equal([r[name] for r in a], [r[name] for r in b])
+        print(f"  {'OK  ' if same else 'FAIL'} {name}: bundle == pickles")
+        ok &= same
+
+    print("\nBundle OK" if ok else "\nBundle MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
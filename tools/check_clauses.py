@@ -0,0 +1,71 @@
+# exported clause engine check (src/clauses.py)
+#  - export_clauses(tm) predicts / votes / scores exactly like the trained
+#    TsetlinModel it was exported from
+#  - throughput: row-by-row TsetlinModel vs batched TsetlinModel vs batched clauses
+#   python -m tools.check_clauses [--rows N] [--epochs E] [--clauses C] [--backend B]
+# uses the feature store (models/features) when present, random rows otherwise
+# exits with status 1 on any mismatch
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.clauses import export_clauses
+from src.config import TM_BACKEND, TSETLIN_CLAUSES
+from src.model_tsetlin import TsetlinModel
+from tools.check_tm_backends import _data, _report
+
+
+def _rate(func, rows):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return f"{rows / elapsed:10.0f} rows/s  ({elapsed * 1e6 / rows:8.1f} us/row)"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--clauses", type=int, default=TSETLIN_CLAUSES)
+    parser.add_argument("--backend", default=TM_BACKEND)
+    args = parser.parse_args()
+
+    X, y = _data(args.rows)
+    tm = TsetlinModel(args.backend, clauses=args.clauses)
+    tm.checkpoint_path = None
+    tm.model.fit(X, y, epochs=args.epochs)
+
+    start = time.perf_counter()
+    clauses = export_clauses(tm)
+    print(
+        f"\n{args.backend}: {args.clauses} clauses, {2 * X.shape[1]} literals, "
+        f"exported in {(time.perf_counter() - start) * 1e3:.1f} ms\n"
+    )
+
+    ok = True
+    ok &= _report("predict", tm.predict(X), clauses.predict(X))
+    ok &= _report("clause votes", tm._votes(X), clauses.votes(X))
+    ok &= _report("confidence", tm.confidence(X), clauses.confidence(X))
+    preds, conf = clauses.scores(X)
+    ok &= _report("scores", (tm.predict(X), tm.confidence(X)), (preds, conf))
+
+    n = X.shape[0]
+    print("\nThroughput (predict + confidence)")
+    print("  TsetlinModel, row by row: " + _rate(
+        lambda: [(tm.predict(X[i : i + 1]), tm.confidence(X[i : i + 1])) for i in range(n)], n
+    ))
+    print("  TsetlinModel, batch:      " + _rate(lambda: (tm.predict(X), tm.confidence(X)), n))
+    print("  clauses, row by row:      " + _rate(
+        lambda: [clauses.scores(X[i : i + 1]) for i in range(n)], n
+    ))
+    print("  clauses, batch:           " + _rate(lambda: clauses.scores(X), n))
+
+    print("\nClauses OK" if ok else "\nClauses MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# parity check: the training path and the prediction path must build the
+# same feature rows for the same text (feature_spec.py is shared by both).
+#   PYTHONHASHSEED=0 python -m tools.check_feature_parity [dataset] [--limit N]
+# (the hash seed main.py runs under, config.HASH_SEED: zemberek lemmas depend on it)
+# exits with status 1 on any mismatch
+
+import argparse
+import sys
+from collections import Counter
+
+import numpy as np
+
+from src.analysis import analyze_text
+from src.corpus import load_corpus
+from src.data_loader import load_data
+from src.feature_spec import FEATURE_SPEC_VERSION, custom_features, fuzzy_inputs
+from src.predict import Predictor, _extract_fuzzy_inputs
+from src.train import fuzzy_column
+from src.fuzzy import INPUTS
+
+samples = [
+    "Sağlık Bakanlığı yeni aşı kampanyasını duyurdu.",
+    "Resmi verilere göre enflasyon oranı düştü. Kaynak: www.tuik.gov.tr 12.05.2024",
+    "ŞOK! Gizli deneyde insanlar görünmez oldu!!!",
+    "Uzaylılar Ankara üzerinde görüldü iddiası!!! Söyleniyor ki çoook yakında...",
+    "",
+]
+
+
+def _report(name, a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    ok = a.shape == b.shape and np.array_equal(a, b)
+    diff = 0.0 if ok or a.shape != b.shape else float(np.abs(a - b).max())
+    print(f"  {'OK  ' if ok else 'FAIL'} {name:<32} shape={a.shape} max|diff|={diff:.3g}")
+    return ok
+
+
+def _report_bags(name, a, b):
+    # lemmatized text compared as token bags: the TF-IDF vectorizer only sees
+    # which lemmas occur how often, not their order
+    wrong = sum(Counter(x.split()) != Counter(y.split()) for x, y in zip(a, b))
+    ok = len(a) == len(b) and wrong == 0
+    print(f"  {'OK  ' if ok else 'FAIL'} {name:<32} {len(a)} texts, {wrong} differ")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dataset", nargs="?", default=None)
+    parser.add_argument("--limit", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = list(samples)
+    if args.dataset:
+        texts += load_data(args.dataset)["text"].tolist()[: args.limit]
+
+    print(f"\nFeature spec v{FEATURE_SPEC_VERSION}, {len(texts)} texts\n")
+
+    # training path: batch analysis (+ corpus cache round trip)
+    fresh = load_corpus(texts, use_cache=False)
+    cached = load_corpus(texts)  # fills the cache
+    cached = load_corpus(texts)  # reads it back
+
+    # prediction path: one document at a time
+    docs = [analyze_text(t) for t in texts]
+    one_custom = np.vstack([custom_features([d]) for d in docs])
+    one_fuzzy = np.vstack([fuzzy_inputs([d]) for d in docs])
+    one_dicts = np.array([[_extract_fuzzy_inputs(d)[k] for k in INPUTS] for d in docs])
+
+    ok = True
+    ok &= _report("custom: train vs predict", fresh.custom, one_custom)
+    ok &= _report("fuzzy inputs: train vs predict", fresh.fuzzy_inputs, one_fuzzy)
+    ok &= _report("fuzzy inputs: predict debug dict", one_fuzzy, one_dicts)
+    ok &= _report("custom: cached vs fresh", cached.custom, fresh.custom)
+    ok &= _report("fuzzy inputs: cached vs fresh", cached.fuzzy_inputs, fresh.fuzzy_inputs)
+    ok &= _report_bags("lemmas: train vs predict", fresh.clean, [d.clean for d in docs])
+    ok &= _report_bags("lemmas: cached vs fresh", cached.clean, fresh.clean)
+    ok &= bool(((fresh.fuzzy_inputs >= 0) & (fresh.fuzzy_inputs <= 1)).all())
+
+    # full rows with the saved vectorizer / scaler, if a model is present
+    try:
+        predictor = Predictor()
+    except (OSError, EOFError) as e:
+        print(f"  (no saved model, skipping full-row check: {e})")
+    else:
+        X_train = np.hstack(
+            [
+                predictor.vectorizer.transform(fresh.clean).toarray(),
+                predictor.scaler.transform(fresh.custom),
+                fuzzy_column(fresh.fuzzy_inputs),
+            ]
+        )
+        ok &= _report("full rows: train vs Predictor", X_train, predictor.features(docs).toarray())
+
+    print("\nParity OK" if ok else "\nParity FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
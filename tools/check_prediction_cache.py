@@ -0,0 +1,95 @@
+# prediction cache check (src/prediction_cache.py): a cache must never change a prediction
+#   python -m tools.check_prediction_cache [--dataset PATH --limit N]
+# scores texts and their variants that differ only in case, punctuation,
+# digits, links or whitespace (the signals the custom / fuzzy features read)
+# through Predictor.predict_batch with the cache on, in several orders and
+# with a cache small enough to evict, then through a cache saved to and
+# loaded from disk, and compares every result with uncached prediction.
+# exits with status 1 on any mismatch. needs a trained model (config.MODEL_BUNDLE_DIR)
+
+import argparse
+import os
+import sys
+import tempfile
+
+from src.data_loader import load_data
+from src.prediction_cache import PredictionCache
+from src.predict import Predictor
+from src.preprocess import simple_clean
+from tools.check_bundle import samples
+
+
+def _variants(text):
+    return [
+        text,
+        text.lower(),
+        text.upper(),
+        simple_clean(text),
+        text.replace("!", "").replace("?", ""),
+        text + "!!!",
+        text + " https://example.com/haber 2024",
+        "  " + text.replace(" ", "   "),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=None, help="also use these documents")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    texts = list(samples)
+    if args.dataset:
+        texts += load_data(args.dataset)["text"].tolist()[: args.limit]
+    texts = list(dict.fromkeys(v for t in texts for v in _variants(t)))
+
+    uncached = Predictor(cache=PredictionCache(None, maxsize=0))
+    expected = dict(zip(texts, uncached.predict_texts(texts)))
+    differing = sum(
+        len({tuple(expected[v].values()) for v in dict.fromkeys(_variants(t))}) > 1
+        for t in samples
+    )
+    print(
+        f"\n{len(texts)} texts; {differing} of {len(samples)} samples score differently "
+        f"across their case / punctuation variants (uncached)\n"
+    )
+
+    ok = True
+
+    def check(name, predictor, order):
+        nonlocal ok
+        got = predictor.predict_batch(order)
+        got += [predictor.predict(t) for t in order]  # second pass: cache hits
+        wrong = sum(g != expected[t] for g, t in zip(got, order + order))
+        ok &= wrong == 0
+        stats = predictor.cache.stats()
+        print(
+            f"  {'OK  ' if wrong == 0 else 'FAIL'} {name:<28} {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['evictions']} evictions"
+            + (f", {wrong} results differ" if wrong else "")
+        )
+
+    for name, order in (
+        ("original first", texts),
+        ("variants first", texts[::-1]),
+    ):
+        check(name, Predictor(cache=PredictionCache("check")), list(order))
+    check("evicting (maxsize 8)", Predictor(cache=PredictionCache("check", maxsize=8)), texts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prediction_cache.npz")
+        first = Predictor(cache=PredictionCache(uncached.version or "check", path=path))
+        first.predict_batch(texts)
+        first.cache.save()
+
+        cache = PredictionCache(uncached.version or "check", path=path)
+        loaded = cache.load()
+        ok &= loaded == len(texts)
+        check(f"loaded from disk ({loaded})", Predictor(cache=cache), texts[::-1])
+
+    print("\nPrediction cache OK" if ok else "\nPrediction cache MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
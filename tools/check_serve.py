@@ -0,0 +1,160 @@
+# inference server check (src/serve.py), localhost only
+#   python -m tools.check_serve [--clients C] [--requests N] [--workers W] [--cache]
+#                               [--max-batch B] [--max-wait-ms MS] [--dataset PATH --limit N]
+# starts the server on a free port in this process, fires C concurrent
+# keep-alive clients at /predict (plus /predict_batch calls), and checks that
+#  - every answer equals Predictor.predict_batch on the same text
+#  - concurrent requests were micro-batched (mean batch size > 1)
+#  - /health, /metrics and the error statuses (400 / 404 / 405) respond
+# the server's prediction cache is off unless --cache (then repeated texts
+# must be cache hits)
+# prints throughput and the server's latency percentiles; exits with status 1
+# on any mismatch. needs a trained model (config.MODEL_BUNDLE_DIR)
+
+import argparse
+import asyncio
+import http.client
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import SERVE_MAX_BATCH, SERVE_MAX_WAIT_MS
+from src.data_loader import load_data
+from src.prediction_cache import PredictionCache
+from src.predict import Predictor
+from src.serve import InferenceServer
+from tools.check_bundle import samples
+
+
+def _start(server):
+    # the server's event loop runs in a background thread
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        async def main():
+            state["loop"] = asyncio.get_running_loop()
+            state["stop"] = asyncio.Event()
+            state["port"] = await server.start("127.0.0.1", 0)
+            ready.set()
+            await state["stop"].wait()
+            await server.close()
+
+        asyncio.run(main())
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        state["loop"].call_soon_threadsafe(state["stop"].set)
+        thread.join()
+
+    return state["port"], stop
+
+
+class _Client:
+    """one keep-alive connection"""
+
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def call(self, method, path, payload=None, raw=None):
+        body = raw if raw is not None else (None if payload is None else json.dumps(payload))
+        self.conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="/predict calls in total")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-batch", type=int, default=SERVE_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVE_MAX_WAIT_MS)
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache on")
+    parser.add_argument("--dataset", default=None, help="request texts from this dataset")
+    parser.add_argument("--limit", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = list(samples)
+    if args.dataset:
+        texts += load_data(args.dataset)["text"].tolist()[: args.limit]
+
+    predictor = Predictor(cache=None if args.cache else PredictionCache(None, maxsize=0))
+    expected = dict(zip(texts, predictor.predict_texts(texts)))
+
+    server = InferenceServer(predictor, args.workers, args.max_batch, args.max_wait_ms)
+    port, stop = _start(server)
+    print(
+        f"\nServer on 127.0.0.1:{port}: {server.workers} worker(s), max batch "
+        f"{args.max_batch}, max wait {args.max_wait_ms:g} ms, model {predictor.version}"
+    )
+
+    ok = True
+
+    def check(name, passed):
+        nonlocal ok
+        ok &= passed
+        print(f"  {name:<36} {'OK' if passed else 'FAILED'}")
+
+    client = _Client(port)
+    status, health = client.call("GET", "/health")
+    check("/health", status == 200 and health["model_version"] == predictor.version)
+    check("404 unknown path", client.call("GET", "/nope")[0] == 404)
+    check("405 wrong method", client.call("GET", "/predict")[0] == 405)
+    check("400 invalid JSON", _Client(port).call("POST", "/predict", raw="{")[0] == 400)
+    check("400 missing text", _Client(port).call("POST", "/predict", {"txt": "a"})[0] == 400)
+    status, batch = client.call("POST", "/predict_batch", {"texts": texts})
+    check("/predict_batch", status == 200 and batch["results"] == [expected[t] for t in texts])
+    empty = client.call("POST", "/predict_batch", {"texts": []})
+    check("/predict_batch (empty)", empty == (200, {"results": []}))
+
+    # concurrent single-text requests, each client on its own connection
+    def worker(i):
+        c = _Client(port)
+        wrong = 0
+        for j in range(i, args.requests, args.clients):
+            text = texts[j % len(texts)]
+            status, result = c.call("POST", "/predict", {"text": text})
+            wrong += status != 200 or result != expected[text]
+        return wrong
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        wrong = sum(pool.map(worker, range(args.clients)))
+    elapsed = time.perf_counter() - start
+    check(f"{args.requests} concurrent /predict", wrong == 0)
+
+    status, metrics = client.call("GET", "/metrics")
+    batches = metrics["batches"]
+    if args.cache:
+        # every /predict text was already scored by /predict_batch
+        cache = metrics["cache"]
+        check("prediction cache hits", cache["hits"] >= args.requests)
+    else:
+        check(
+            "micro-batching (mean batch size > 1)",
+            args.clients == 1 or args.max_batch == 1 or batches["mean_size"] > 1,
+        )
+    stop()
+
+    p = metrics["requests"]["/predict"]
+    print(
+        f"\n{args.clients} clients: {args.requests / elapsed:.0f} requests/s\n"
+        f"/predict latency   p50 {p['p50_ms']:.1f} ms  p90 {p['p90_ms']:.1f} ms  "
+        f"p99 {p['p99_ms']:.1f} ms  max {p['max_ms']:.1f} ms\n"
+        f"batches            {batches['count']} (mean {batches['mean_size']} texts, "
+        f"max {batches['max_size']}), p50 {batches.get('p50_ms', 0.0):.1f} ms\n"
+        f"prediction cache   {metrics['cache']}"
+    )
+
+    print("\nServer OK" if ok else "\nServer MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# parity check for the Tsetlin Machine backends (config.TM_BACKEND)
+#  - a "pytm" state loaded into the NumPy machine gives identical
+#    predictions / clause votes / confidences
+#  - "numpy" is reproducible for a fixed seed (also across fit calls and a
+#    pickle round trip)
+#  - training time per backend
+#   python -m tools.check_tm_backends [--rows N] [--epochs E]
+# uses the feature store (models/features) when present, random rows otherwise
+# exits with status 1 on any mismatch
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from src.binarize import ThermometerBinarizer
+from src.config import FEATURE_STORE_DIR, TSETLIN_CLAUSES
+from src.feature_store import FeatureStore
+from src.model_tsetlin import TsetlinModel
+
+
+def _data(rows):
+    if os.path.exists(os.path.join(FEATURE_STORE_DIR, "manifest.json")):
+        store = FeatureStore(FEATURE_STORE_DIR)
+        X, y = store["X_train"][:rows], np.asarray(store["y_train"][:rows])
+        print(f"Feature store {FEATURE_STORE_DIR}: {X.shape[0]} rows")
+        binarizer = ThermometerBinarizer()
+        binarizer.fit(X)
+        X_bin = binarizer.transform(X)
+        return X_bin.toarray() if hasattr(X_bin, "toarray") else X_bin, y
+
+    print("No feature store, using random rows")
+    rng = np.random.default_rng(0)
+    X = (rng.random((rows, 200)) < 0.2).astype(np.uint8)
+    return X, (X[:, 0] | X[:, 1]) ^ X[:, 2]
+
+
+def _report(name, a, b):
+    ok = np.array_equal(np.asarray(a), np.asarray(b))
+    print(f"  {'OK  ' if ok else 'FAIL'} {name}")
+    return ok
+
+
+def _fit(backend, X, y, epochs):
+    model = TsetlinModel(backend)
+    start = time.perf_counter()
+    model.model.fit(X, y, epochs=epochs)
+    print(f"  {backend:<9} {epochs} epochs on {X.shape}: {time.perf_counter() - start:.2f}s")
+    return model
+
+
+def _fit_split(X, y, epochs):
+    # numpy machine trained in two fit calls, pickled in between
+    model = TsetlinModel("numpy")
+    model.model.fit(X, y, epochs=1)
+    model.model = pickle.loads(pickle.dumps(model.model))
+    model.model.fit(X, y, epochs=epochs - 1, incremental=True)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--epochs", type=int, default=3)
+    args = parser.parse_args()
+
+    X, y = _data(args.rows)
+    print(f"\n{TSETLIN_CLAUSES} clauses, {2 * X.shape[1]} literals\n")
+
+    c_model = _fit("pytm", X, y, args.epochs)
+    np_model = _fit("numpy", X, y, args.epochs)
+    again = _fit("numpy", X, y, args.epochs)
+    print()
+
+    ok = True
+
+    # same state >> same inference
+    np_model.model.set_state(c_model.model.get_state())
+    np_model._empty = None
+    ok &= _report("pytm state: predict", c_model.predict(X), np_model.predict(X))
+    ok &= _report("pytm state: clause votes", c_model._votes(X), np_model._votes(X))
+    ok &= _report("pytm state: confidence", c_model.confidence(X), np_model.confidence(X))
+
+    # same seed >> same machine
+    ok &= _report("numpy: fixed seed reproducible", again.model.ta, _fit("numpy", X, y, args.epochs).model.ta)
+    split = _fit_split(X, y, args.epochs)
+    ok &= _report("numpy: reproducible (pickled mid-run)", split.model.ta, again.model.ta)
+    ok &= _report("numpy: reproducible (pickled mid-run): predict", split.predict(X), again.predict(X))
+    print(f"  numpy training accuracy {np.mean(again.predict(X) == y):.4f}")
+
+    print("\nAll backends agree" if ok else "\nBackend MISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()